@@ -4,6 +4,7 @@ from sqlalchemy import engine_from_config, pool
 
 from alembic import context
 from src.addresses.models import address  # noqa: F401
+from src.changes.models import change_log  # noqa: F401
 from src.config import settings
 from src.decisions.models import decision  # noqa: F401
 from src.models import Base
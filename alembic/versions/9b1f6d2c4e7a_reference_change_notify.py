@@ -0,0 +1,53 @@
+"""Reference change notify
+
+Revision ID: 9b1f6d2c4e7a
+Revises: 54fc3dc05798
+Create Date: 2026-10-18 09:12:41.305718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b1f6d2c4e7a"
+down_revision: Union[str, None] = "54fc3dc05798"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCE_TABLES = (
+    "city",
+    "district",
+    "industry",
+    "support_org",
+    "support_programm",
+)
+
+
+def upgrade() -> None:
+    # Воркеры API держат справочники в памяти и сбрасывают кэш
+    # по уведомлению в канале reference_changed
+    op.execute(
+        """
+        CREATE FUNCTION notify_reference_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('reference_changed', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in REFERENCE_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_notify_changed
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_changed()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in REFERENCE_TABLES:
+        op.execute(f"DROP TRIGGER {table}_notify_changed ON {table}")
+    op.execute("DROP FUNCTION notify_reference_changed()")
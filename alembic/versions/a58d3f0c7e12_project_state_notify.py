@@ -0,0 +1,60 @@
+"""Project state notify
+
+Revision ID: a58d3f0c7e12
+Revises: f7c2b4e81d93
+Create Date: 2026-10-18 15:40:12.481906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a58d3f0c7e12"
+down_revision: Union[str, None] = "f7c2b4e81d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Воркеры API рассылают смены состояния проектов подписчикам
+    # /projects/events, payload содержит все поля для фильтрации
+    op.execute(
+        """
+        CREATE FUNCTION notify_project_state() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('project_state', json_build_object(
+                'id', NEW.id,
+                'state', NEW.state,
+                'previous_state',
+                    CASE WHEN TG_OP = 'UPDATE' THEN OLD.state END,
+                'industry_id', NEW.industry_id,
+                'version', NEW.version,
+                'updated_at', NEW.updated_at
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_notify_state_insert
+        AFTER INSERT ON project
+        FOR EACH ROW EXECUTE FUNCTION notify_project_state()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_notify_state_update
+        AFTER UPDATE OF state ON project
+        FOR EACH ROW WHEN (OLD.state IS DISTINCT FROM NEW.state)
+        EXECUTE FUNCTION notify_project_state()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER project_notify_state_update ON project")
+    op.execute("DROP TRIGGER project_notify_state_insert ON project")
+    op.execute("DROP FUNCTION notify_project_state()")
@@ -0,0 +1,55 @@
+"""Foreign key indexes
+
+Revision ID: c3a8e5f17b20
+Revises: 9b1f6d2c4e7a
+Create Date: 2026-10-18 11:40:03.114862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a8e5f17b20"
+down_revision: Union[str, None] = "9b1f6d2c4e7a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("project", "owner_id"),
+    ("project", "industry_id"),
+    ("project", "address_id"),
+    ("support", "project_id"),
+    ("decision", "support_id"),
+    ("user_project", "user_id"),
+    ("user_project", "project_id"),
+    ("owner_contact", "owner_id"),
+    ("business_org", "inn"),
+    ("business_org", "ogrn"),
+    ("business_man", "inn"),
+    ("business_man", "ogrn"),
+)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.create_index(
+                f"{table}_{column}_idx",
+                table,
+                [column],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.drop_index(
+                f"{table}_{column}_idx",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
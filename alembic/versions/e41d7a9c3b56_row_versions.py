@@ -0,0 +1,95 @@
+"""Row versions
+
+Revision ID: e41d7a9c3b56
+Revises: c3a8e5f17b20
+Create Date: 2026-10-18 13:05:27.548301
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e41d7a9c3b56"
+down_revision: Union[str, None] = "c3a8e5f17b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("project", "support", "decision", "address", "user")
+
+
+def upgrade() -> None:
+    # Версия растет, только если строка действительно изменилась,
+    # UPDATE с теми же значениями ETag не меняет
+    op.execute(
+        """
+        CREATE FUNCTION row_version_bump() RETURNS trigger AS $$
+        BEGIN
+            IF NEW IS DISTINCT FROM OLD THEN
+                NEW.version := OLD.version + 1;
+                NEW.updated_at := now();
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Воркеры API держат версии прочитанных строк в памяти
+    # и сбрасывают их по уведомлению в канале row_changed
+    op.execute(
+        """
+        CREATE FUNCTION notify_row_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('row_changed', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "version",
+                sa.BigInteger(),
+                server_default=sa.text("1"),
+                nullable=False,
+                comment="Версия строки",
+            ),
+        )
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+                comment="Время последнего изменения",
+            ),
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_version_bump
+            BEFORE UPDATE ON "{table}"
+            FOR EACH ROW EXECUTE FUNCTION row_version_bump()
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_notify_changed
+            AFTER UPDATE OR DELETE OR TRUNCATE ON "{table}"
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_row_changed()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER {table}_notify_changed ON "{table}"')
+        op.execute(f'DROP TRIGGER {table}_version_bump ON "{table}"')
+        op.drop_column(table, "updated_at")
+        op.drop_column(table, "version")
+    op.execute("DROP FUNCTION notify_row_changed()")
+    op.execute("DROP FUNCTION row_version_bump()")
@@ -0,0 +1,131 @@
+"""Change log
+
+Revision ID: f7c2b4e81d93
+Revises: e41d7a9c3b56
+Create Date: 2026-10-18 14:22:51.093617
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f7c2b4e81d93"
+down_revision: Union[str, None] = "e41d7a9c3b56"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("project", "support", "decision", "address", "user")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "txid",
+            sa.BigInteger(),
+            server_default=sa.text("txid_current()"),
+            nullable=False,
+            comment="Транзакция, в которой произошло изменение",
+        ),
+        sa.Column("table_name", sa.Text(), nullable=False, comment="Таблица"),
+        sa.Column(
+            "row_id",
+            sa.Integer(),
+            nullable=True,
+            comment="id строки, NULL для TRUNCATE",
+        ),
+        sa.Column(
+            "operation",
+            sa.Enum(
+                "INSERT",
+                "UPDATE",
+                "DELETE",
+                "TRUNCATE",
+                name="change_operation_type",
+            ),
+            nullable=False,
+            comment="Вид изменения",
+        ),
+        sa.Column(
+            "version",
+            sa.BigInteger(),
+            nullable=True,
+            comment="Версия строки после изменения",
+        ),
+        sa.Column(
+            "data",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+            comment="Строка после изменения",
+        ),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время изменения",
+        ),
+        sa.PrimaryKeyConstraint("id", name="change_log_pkey"),
+        comment="Журнал изменений для синхронизации клиентов",
+    )
+    # Лента читается по (txid, id), см. src/changes/service.py
+    op.create_index("change_log_txid_id_idx", "change_log", ["txid", "id"])
+
+    # UPDATE без изменений версию не меняет (row_version_bump)
+    # и в журнал не попадает
+    op.execute(
+        """
+        CREATE FUNCTION log_row_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                INSERT INTO change_log (table_name, operation)
+                VALUES (TG_TABLE_NAME, TG_OP::change_operation_type);
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO change_log (table_name, row_id, operation, version)
+                VALUES (
+                    TG_TABLE_NAME, OLD.id,
+                    TG_OP::change_operation_type, OLD.version
+                );
+            ELSIF TG_OP = 'INSERT' OR NEW.version <> OLD.version THEN
+                INSERT INTO change_log
+                    (table_name, row_id, operation, version, data)
+                VALUES (
+                    TG_TABLE_NAME, NEW.id, TG_OP::change_operation_type,
+                    NEW.version, to_jsonb(NEW)
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_log_change
+            AFTER INSERT OR UPDATE OR DELETE ON "{table}"
+            FOR EACH ROW EXECUTE FUNCTION log_row_change()
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_log_truncate
+            AFTER TRUNCATE ON "{table}"
+            FOR EACH STATEMENT EXECUTE FUNCTION log_row_change()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER {table}_log_truncate ON "{table}"')
+        op.execute(f'DROP TRIGGER {table}_log_change ON "{table}"')
+    op.execute("DROP FUNCTION log_row_change()")
+    op.drop_index("change_log_txid_id_idx", table_name="change_log")
+    op.drop_table("change_log")
+    sa.Enum(name="change_operation_type").drop(op.get_bind())
@@ -0,0 +1,59 @@
+# Стоимость сериализации списка проектов на строку:
+# как раньше (валидация response_model + json) и через RowsJSONResponse.
+#
+#   python -m benchmarks.serialization [rows]
+import json
+import sys
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+
+from src.projects.schemas import Project
+from src.responses import RowsJSONResponse
+
+
+def make_rows(count: int) -> list[dict]:
+    updated_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "owner_id": i % 100,
+            "address_id": i % 50,
+            "industry_id": i % 10,
+            "name": f"Проект Номер {i}",
+            "application_own_amount": Decimal("1500000.50"),
+            "application_support_amount": Decimal("3000000"),
+            "work_place_count": 25,
+            "nalog_amount": 120000,
+            "description": "Строительство гостиничного комплекса " * 5,
+            "state": "PROJECT_IN_COMISSION",
+            "version": 1,
+            "updated_at": updated_at,
+        }
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rows = make_rows(count)
+    adapter = TypeAdapter(list[Project])
+
+    def validated() -> bytes:
+        # Так FastAPI обрабатывает return db_projects с response_model
+        value = adapter.validate_python(rows)
+        content = adapter.dump_python(value, mode="json")
+        return json.dumps(content, ensure_ascii=False).encode()
+
+    def direct() -> bytes:
+        return RowsJSONResponse(rows).body
+
+    for name, func in (("response_model", validated), ("orjson", direct)):
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{name:>15}: {seconds / count * 1e6:.2f} мкс/строка")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ from sqlalchemy import (
     Text,
 )
 
-from src.models import Base
+from src.models import Base, row_version_columns
 
 address = Table(
     "address",
@@ -17,6 +17,7 @@ address = Table(
     Column("city_id", Integer),
     Column("post_code", Text, comment="Почтовый индекс"),
     Column("address", Text, comment="Улица, дом, квартира, офис"),
+    *row_version_columns(),
     ForeignKeyConstraint(["city_id"], ["city.id"], name="address_city_id_fkey"),
     ForeignKeyConstraint(
         ["district_id"], ["district.id"], name="address_district_id_fkey"
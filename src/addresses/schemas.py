@@ -1,9 +1,13 @@
+from dataclasses import dataclass
+from typing import Annotated, Literal
+
+from fastapi import Query
 from pydantic import (
     Field,
     field_validator,
 )
 
-from src.schemas import BasePatchSchema, BaseSchema
+from src.schemas import BasePatchSchema, BaseSchema, VersionedSchema
 
 
 class AddressBase(BaseSchema):
@@ -25,7 +29,7 @@ class AddressUpdate(AddressBase):
     pass
 
 
-class Address(AddressBase):
+class Address(AddressBase, VersionedSchema):
     id: int
 
 
@@ -38,3 +42,17 @@ class AddressPatch(AddressBase, BasePatchSchema):
     address: str | None = Field(
         default=None, description="Улица, дом, квартира, офис"
     )
+
+
+AddressSort = Literal["id", "-id", "post_code", "-post_code"]
+
+
+@dataclass
+class AddressFilter:
+    city_id: Annotated[
+        int | None, Query(description="ID населенного пункта")
+    ] = None
+    district_id: Annotated[int | None, Query(description="ID района")] = None
+    post_code: Annotated[
+        str | None, Query(pattern=r"^[0-9]{6}$", description="Почтовый индекс")
+    ] = None
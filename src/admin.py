@@ -0,0 +1,48 @@
+import hmac
+from typing import Annotated
+
+from fastapi import Depends, Header, HTTPException, status
+
+from src.config import settings
+
+
+def _matches(token: str | None, expected: str | None) -> bool:
+    if expected is None or token is None:
+        return False
+
+    # compare_digest падает на не-ASCII строках, сравниваем байты
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+def is_admin_token(token: str | None) -> bool:
+    return _matches(token, settings.ADMIN_TOKEN)
+
+
+def require_admin(
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> None:
+    # Без ADMIN_TOKEN служебные эндпоинты отключены
+    if settings.ADMIN_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+
+AdminOnly = Depends(require_admin)
+
+
+def require_scraper(
+    authorization: Annotated[str | None, Header()] = None,
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> None:
+    if settings.METRICS_TOKEN is None and settings.ADMIN_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and _matches(token, settings.METRICS_TOKEN):
+        return
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+
+ScraperOnly = Depends(require_scraper)
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from typing import Annotated, Any, Awaitable, Callable
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import Delete, Select, Table, Update
+
+from src.references.service import cache, reference_error
+
+MAX_BULK_ROWS = 10_000
+
+MAX_AFFECTED_ROWS = 100_000
+
+
+class BulkRowError(BaseModel):
+    index: int = Field(description="Номер строки во входном списке")
+    errors: list[dict[str, Any]] = Field(description="Ошибки валидации")
+
+
+class BulkCreated(BaseModel):
+    ids: list[int] = Field(description="ID созданных записей по порядку")
+    errors: list[BulkRowError] = Field(
+        default=[], description="Строки, не прошедшие валидацию"
+    )
+
+
+class BulkAffected(BaseModel):
+    affected: int = Field(description="Затронуто строк")
+    estimated: bool = Field(
+        description="Оценка планировщика, операция не выполнялась"
+    )
+
+
+@dataclass
+class SetParams:
+    dry_run: Annotated[
+        bool,
+        Query(description="Только оценить число строк по плану запроса"),
+    ] = False
+    max_rows: Annotated[
+        int,
+        Query(
+            ge=1,
+            le=MAX_AFFECTED_ROWS,
+            description="Отменить операцию, если затронуто больше строк",
+        ),
+    ] = 1000
+
+    def check(self, affected: int) -> None:
+        if affected > self.max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"Операция затрагивает {affected} строк, "
+                    f"больше max_rows={self.max_rows}"
+                ),
+            )
+
+
+def filter_rows(
+    query: Update | Delete, table: Table, select_query: Select
+) -> Update | Delete:
+    # Фильтры списка переносятся в UPDATE/DELETE полусоединением по id,
+    # так работают и фильтры с JOIN
+    if select_query.whereclause is None:
+        return query
+
+    return query.where(
+        table.c.id.in_(select_query.with_only_columns(table.c.id))
+    )
+
+
+async def apply_to_set(
+    params: SetParams,
+    estimate: Callable[[], Awaitable[int]],
+    apply: Callable[[], Awaitable[int]],
+) -> dict[str, Any]:
+    # Оценка по EXPLAIN только для dry_run: при устаревшей статистике
+    # она бывает сильно завышена. max_rows проверяется по точному числу
+    # после выполнения, при превышении транзакция запроса откатывается
+    if params.dry_run:
+        return {"affected": await estimate(), "estimated": True}
+
+    affected = await apply()
+    params.check(affected)
+
+    return {"affected": affected, "estimated": False}
+
+
+async def validate_rows(
+    schema: type[BaseModel], rows: list[Any], table: Table
+) -> tuple[list[BaseModel], list[BulkRowError]]:
+    valid = []
+    errors = []
+
+    for index, row in enumerate(rows):
+        try:
+            model = schema.model_validate(row)
+        except ValidationError as e:
+            errors.append(
+                BulkRowError(
+                    index=index,
+                    errors=e.errors(include_url=False, include_context=False),
+                )
+            )
+            continue
+
+        missing = await cache.missing_references(table, model.model_dump())
+        if missing:
+            errors.append(
+                BulkRowError(
+                    index=index,
+                    errors=[reference_error(field) for field in missing],
+                )
+            )
+            continue
+
+        valid.append(model)
+
+    return valid, errors
@@ -0,0 +1,55 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    Table,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.models import Base
+
+change_log = Table(
+    "change_log",
+    Base.metadata,
+    Column("id", BigInteger),
+    Column(
+        "txid",
+        BigInteger,
+        nullable=False,
+        server_default=text("txid_current()"),
+        comment="Транзакция, в которой произошло изменение",
+    ),
+    Column("table_name", Text, nullable=False, comment="Таблица"),
+    Column("row_id", Integer, comment="id строки, NULL для TRUNCATE"),
+    Column(
+        "operation",
+        Enum(
+            "INSERT",
+            "UPDATE",
+            "DELETE",
+            "TRUNCATE",
+            name="change_operation_type",
+        ),
+        nullable=False,
+        comment="Вид изменения",
+    ),
+    Column("version", BigInteger, comment="Версия строки после изменения"),
+    Column("data", JSONB, comment="Строка после изменения"),
+    Column(
+        "changed_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="Время изменения",
+    ),
+    PrimaryKeyConstraint("id", name="change_log_pkey"),
+    Index("change_log_txid_id_idx", "txid", "id"),
+    comment="Журнал изменений для синхронизации клиентов",
+)
@@ -0,0 +1,50 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query, status
+
+from src.changes import service
+from src.changes.schemas import ChangesPage, ChangeTable
+from src.database import DbConnection
+from src.pagination import MAX_LIMIT
+from src.responses import RowsJSONResponse
+
+router = APIRouter(prefix="/changes", tags=["Изменения"])
+
+
+@router.get(
+    "/",
+    response_model=ChangesPage,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": None},
+    },
+    summary="Получить изменения после курсора",
+)
+async def get_changes(
+    connection: DbConnection,
+    since: Annotated[
+        str | None,
+        Query(description="Курсор из предыдущего ответа или из /changes/head"),
+    ] = None,
+    tables: Annotated[
+        list[ChangeTable] | None, Query(description="Только эти таблицы")
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = 100,
+):
+    db_changes, cursor, has_more = await service.get_changes(
+        since, tables, limit, connection=connection
+    )
+
+    return RowsJSONResponse(
+        {"changes": db_changes, "cursor": cursor, "has_more": has_more}
+    )
+
+
+@router.get(
+    "/head",
+    response_model=str,
+    status_code=status.HTTP_200_OK,
+    summary="Получить курсор последнего изменения",
+)
+async def get_head(connection: DbConnection):
+    return await service.get_head(connection=connection)
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+ChangeTable = Literal["project", "support", "decision", "address", "user"]
+
+ChangeOperation = Literal["INSERT", "UPDATE", "DELETE", "TRUNCATE"]
+
+
+class Change(BaseModel):
+    table_name: ChangeTable = Field(description="Таблица")
+    row_id: int | None = Field(description="id строки, null для TRUNCATE")
+    operation: ChangeOperation = Field(description="Вид изменения")
+    version: int | None = Field(description="Версия строки после изменения")
+    data: dict[str, Any] | None = Field(
+        description="Строка после изменения, null для DELETE и TRUNCATE"
+    )
+    changed_at: datetime = Field(description="Время изменения")
+
+
+class ChangesPage(BaseModel):
+    changes: list[Change]
+    cursor: str = Field(description="Передать в since при следующем запросе")
+    has_more: bool = Field(description="Есть еще изменения после cursor")
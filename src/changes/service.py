@@ -0,0 +1,105 @@
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.changes.models import change_log
+from src.changes.schemas import ChangeTable
+from src.database import fetch_all, fetch_one
+
+# Лента упорядочена по (txid, id) и отдает только транзакции младше
+# самой старой незавершенной: все они уже закоммичены или откатились,
+# а новые получат txid не меньше. Поэтому строка с меньшим ключом не
+# может появиться позже курсора, даже если транзакции коммитятся не по
+# порядку номеров
+COMMITTED = change_log.c.txid < func.txid_snapshot_xmin(
+    func.txid_current_snapshot()
+)
+
+CHANGE_COLUMNS = (
+    change_log.c.table_name,
+    change_log.c.row_id,
+    change_log.c.operation,
+    change_log.c.version,
+    change_log.c.data,
+    change_log.c.changed_at,
+)
+
+
+def encode_cursor(txid: int, id: int) -> str:
+    return f"{txid}-{id}"
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        txid, id = map(int, cursor.split("-"))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор",
+        )
+
+    return txid, id
+
+
+def select_changes(
+    since: str | None, tables: list[ChangeTable] | None
+) -> Select:
+    select_query = select(
+        change_log.c.txid, change_log.c.id, *CHANGE_COLUMNS
+    ).where(COMMITTED)
+
+    if since is not None:
+        select_query = select_query.where(
+            tuple_(change_log.c.txid, change_log.c.id) > decode_cursor(since)
+        )
+    if tables:
+        select_query = select_query.where(change_log.c.table_name.in_(tables))
+
+    return select_query.order_by(change_log.c.txid, change_log.c.id)
+
+
+async def get_changes(
+    since: str | None,
+    tables: list[ChangeTable] | None,
+    limit: int,
+    connection: AsyncConnection | None = None,
+) -> tuple[list[dict[str, Any]], str, bool]:
+    select_query = select_changes(since, tables).limit(limit + 1)
+
+    db_changes = await fetch_all(select_query, connection)
+
+    has_more = len(db_changes) > limit
+    db_changes = db_changes[:limit]
+
+    if db_changes:
+        last = db_changes[-1]
+        cursor = encode_cursor(last["txid"], last["id"])
+    elif since is not None:
+        cursor = since
+    else:
+        cursor = await get_head(connection)
+
+    for db_change in db_changes:
+        del db_change["txid"], db_change["id"]
+
+    return db_changes, cursor, has_more
+
+
+async def get_head(connection: AsyncConnection | None = None) -> str:
+    # Курсор последнего закоммиченного изменения: клиент выгружает
+    # таблицы целиком и продолжает синхронизацию с этого места
+    select_query = (
+        select(change_log.c.txid, change_log.c.id)
+        .where(COMMITTED)
+        .order_by(change_log.c.txid.desc(), change_log.c.id.desc())
+        .limit(1)
+    )
+
+    db_head = await fetch_one(select_query, connection)
+
+    if db_head is None:
+        return encode_cursor(0, 0)
+
+    return encode_cursor(db_head["txid"], db_head["id"])
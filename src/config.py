@@ -7,8 +7,58 @@ from pydantic_settings import BaseSettings
 class Config(BaseSettings):
     DATABASE_URL: PostgresDsn
 
+    # Пул соединений. Если DB_POOL_SIZE не задан, размер вычисляется
+    # из общего лимита соединений DB_MAX_CONNECTIONS и числа воркеров
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_MAX_CONNECTIONS: int = 90
+    DB_ECHO: bool = False
+
+    # С какого размера пачки массовая вставка идет через COPY
+    DB_COPY_THRESHOLD: int = 1000
+
+    # Число воркеров uvicorn, uvicorn читает ту же переменную
+    WEB_CONCURRENCY: int = 1
+
+    # Отладка запросов к БД для dev/staging: повторяющиеся запросы (N+1),
+    # медленные запросы с планом, бюджет запросов маршрута. В строгом
+    # режиме превышение бюджета — ошибка запроса, тесты падают
+    DB_QUERY_DEBUG: bool = False
+    DB_QUERY_REPEAT_THRESHOLD: int = 5
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_QUERY_BUDGET: int | None = None
+    DB_QUERY_BUDGET_STRICT: bool = False
+
+    # Токен служебных эндпоинтов /internal, заголовок X-Admin-Token.
+    # Без него эти эндпоинты отключены
+    ADMIN_TOKEN: str | None = None
+    # Токен для сбора /metrics: Authorization: Bearer <токен>, как его
+    # отправляет Prometheus. X-Admin-Token для /metrics тоже подходит
+    METRICS_TOKEN: str | None = None
+
+    # Общий каталог метрик воркеров. Без него при WEB_CONCURRENCY > 1
+    # /metrics отдает метрики только ответившего воркера
+    METRICS_DIR: str | None = None
+
+    # Импорт: предельный размер файла, число одновременных импортов
+    # на воркер и сколько секунд воркер хранит состояние завершенного
+    IMPORT_MAX_BYTES: int = 100 * 1024 * 1024
+    IMPORT_MAX_JOBS: int = 2
+    IMPORT_JOB_TTL: int = 3600
+
     APP_VERSION: str = "1.0"
 
+    @property
+    def db_pool_size(self) -> int:
+        if self.DB_POOL_SIZE is not None:
+            return self.DB_POOL_SIZE
+
+        per_worker = self.DB_MAX_CONNECTIONS // max(self.WEB_CONCURRENCY, 1)
+        return max(per_worker - self.DB_MAX_OVERFLOW, 1)
+
 
 settings: Config = Config()
 
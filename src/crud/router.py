@@ -0,0 +1,456 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Annotated, Any, Awaitable, Callable
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.bulk import (
+    MAX_BULK_ROWS,
+    BulkAffected,
+    BulkCreated,
+    SetParams,
+    apply_to_set,
+    validate_rows,
+)
+from src.constants import PathParamId
+from src.crud.service import CrudService, check_schemas
+from src.database import DbConnection, query_budget
+from src.etags import Conditional, IfMatch, validators, versions
+from src.export import ExportFormatParam, export_response
+from src.fields import Projection
+from src.pagination import (
+    Pagination,
+    PaginationParams,
+    set_page_headers,
+    split_page,
+)
+from src.responses import RowsJSONResponse
+
+
+async def list_page(
+    crud: CrudService,
+    filters: Any,
+    sort: str,
+    pagination: PaginationParams,
+    projection: Projection,
+    request: Request,
+    response: Response,
+    location: str,
+    connection: DbConnection,
+    ensure_parent: Callable[[], Awaitable[None]] | None = None,
+) -> RowsJSONResponse:
+    # Страница списка: ресурса целиком или вложенного (/users/{id}/projects)
+    db_rows = await crud.get_many(
+        filters,
+        sort,
+        pagination,
+        fields=projection.columns(sort.lstrip("-")),
+        connection=connection,
+    )
+    db_rows, next_cursor = split_page(db_rows, sort, pagination)
+    await projection.apply(db_rows)
+
+    # Пустая страница вложенного списка: проверяем, есть ли родитель
+    if not db_rows and ensure_parent is not None:
+        await ensure_parent()
+
+    total = None
+    if pagination.count:
+        total = await crud.count(filters, connection=connection)
+
+    response.headers["Content-Location"] = location
+    set_page_headers(request, response, next_cursor, total)
+    return RowsJSONResponse(db_rows, headers=dict(response.headers))
+
+
+@dataclass(frozen=True)
+class Names:
+    # Формы названия ресурса для описаний эндпоинтов
+    one: str  # Удалить пользователя, получить адрес
+    one_of: str  # Изменить данные пользователя, адреса
+    new: str  # Создать нового пользователя, новый адрес
+    many: str  # Создать пользователей, адреса списком
+    many_of: str  # Получить список пользователей, адресов
+    all: str  # Удалить всех пользователей, все адреса
+
+
+def add_crud_routes(
+    router: APIRouter,
+    crud: CrudService,
+    names: Names,
+    read: type[BaseModel],
+    create: type[BaseModel],
+    update: type[BaseModel],
+    patch: type[BaseModel],
+    filter: type,
+    sort: Any,
+) -> None:
+    # Стандартные эндпоинты ресурса. Свои статические пути вроде
+    # /projects/events регистрируются до вызова, иначе их перехватит /{id}
+    check_schemas(crud.table, read, [create, update, patch])
+
+    resource = router.prefix.strip("/")
+    new_word = names.new.split()[0]
+
+    # Бюджет чтения: строки, счетчик и по запросу на каждую связь
+    # из include. Больше — значит связи грузятся построчно (N+1)
+    read_budget = query_budget(2 + len(crud.relations))
+
+    # Версии строк, записанных этим воркером, обновляются сразу,
+    # не дожидаясь уведомления из БД
+    table_versions = versions.tables[crud.table.name]
+
+    def location(id: int) -> str:
+        return f"{router.prefix}/{id}"
+
+    async def unchanged(
+        id: int,
+        values: dict[str, Any],
+        precondition: IfMatch,
+        response: Response,
+        connection: DbConnection,
+        missing: int,
+    ) -> Response:
+        # UPDATE не вернул строку: строки нет, версия не та,
+        # переход запрещен условием записи или нет изменений
+        db_row = await crud.probe(id, connection=connection)
+
+        if db_row is None:
+            raise HTTPException(status_code=missing)
+        if precondition is not None and not precondition.matches(db_row):
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED)
+        if crud.guard is not None:
+            crud.guard.check(db_row, values)
+
+        # Если нет изменений, возвращем 204
+        response.headers.update(validators(db_row))
+        return Response(
+            status_code=status.HTTP_204_NO_CONTENT, headers=response.headers
+        )
+
+    @router.post(
+        "/",
+        name=f"create_{resource}",
+        status_code=status.HTTP_201_CREATED,
+        summary=f"Создать {names.new}",
+    )
+    async def create_row(item: create, connection: DbConnection):
+        new_row = await crud.create(item, connection=connection)
+
+        headers = {"Location": location(new_row["id"])}
+        return Response(status_code=status.HTTP_201_CREATED, headers=headers)
+
+    @router.post(
+        "/bulk",
+        name=f"create_{resource}_bulk",
+        response_model=BulkCreated,
+        status_code=status.HTTP_201_CREATED,
+        responses={
+            status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": None},
+        },
+        summary=f"Создать {names.many} списком",
+    )
+    async def create_rows(
+        items: Annotated[list[dict[str, Any]], Body(max_length=MAX_BULK_ROWS)],
+        connection: DbConnection,
+        atomic: Annotated[
+            bool, Query(description="Отклонить весь список при ошибке в строке")
+        ] = False,
+    ):
+        valid_items, errors = await validate_rows(create, items, crud.table)
+
+        if errors and atomic:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=[error.model_dump() for error in errors],
+            )
+
+        ids = await crud.create_many(valid_items, connection=connection)
+
+        return {"ids": ids, "errors": errors}
+
+    @router.get(
+        "/",
+        name=f"get_{resource}",
+        response_model=list[read],
+        status_code=status.HTTP_200_OK,
+        dependencies=[read_budget],
+        summary=f"Получить список {names.many_of}",
+    )
+    async def get_rows(
+        request: Request,
+        response: Response,
+        filters: Annotated[filter, Depends()],
+        pagination: Pagination,
+        connection: DbConnection,
+        projection: Annotated[Projection, Depends(crud.projection_params)],
+        sort: Annotated[
+            sort, Query(description="Поле сортировки, '-' для убывания")
+        ] = "id",
+    ):
+        return await list_page(
+            crud,
+            filters,
+            sort,
+            pagination,
+            projection,
+            request,
+            response,
+            router.prefix,
+            connection,
+        )
+
+    @router.get(
+        "/export",
+        name=f"export_{resource}",
+        response_class=StreamingResponse,
+        status_code=status.HTTP_200_OK,
+        summary=f"Выгрузить {names.many} в NDJSON или CSV",
+    )
+    async def export_rows(
+        filters: Annotated[filter, Depends()],
+        format: ExportFormatParam = "ndjson",
+    ):
+        select_query = crud.select_rows(filters).order_by("id")
+
+        return export_response(select_query, format, resource)
+
+    @router.get(
+        "/{id}",
+        name=f"get_{resource}_by_id",
+        response_model=read,
+        status_code=status.HTTP_200_OK,
+        dependencies=[read_budget],
+        responses={
+            status.HTTP_304_NOT_MODIFIED: {"model": None},
+            status.HTTP_404_NOT_FOUND: {"model": None},
+        },
+        summary=f"Получить {names.one} по id",
+    )
+    async def get_row(
+        id: PathParamId,
+        response: Response,
+        conditional: Annotated[Conditional, Depends(crud.conditional_params)],
+        connection: DbConnection,
+        projection: Annotated[Projection, Depends(crud.projection_params)],
+    ):
+        db_row = await crud.get_by_id(
+            id, fields=projection.columns(), connection=connection
+        )
+
+        if db_row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+        await projection.apply([db_row])
+
+        response.headers["Content-Location"] = location(id)
+        if conditional.respond(id, db_row, response.headers):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=response.headers,
+            )
+        return RowsJSONResponse(db_row, headers=dict(response.headers))
+
+    @router.put(
+        "/",
+        name=f"update_{resource}",
+        response_model=BulkAffected,
+        status_code=status.HTTP_200_OK,
+        responses={
+            status.HTTP_409_CONFLICT: {"model": None},
+        },
+        summary=f"Заменить данные всех {names.many_of}",
+    )
+    async def update_rows(
+        item: update,
+        filters: Annotated[filter, Depends()],
+        params: Annotated[SetParams, Depends()],
+        connection: DbConnection,
+    ):
+        return await apply_to_set(
+            params,
+            partial(crud.count, filters, connection=connection),
+            partial(crud.update_all, item, filters, connection=connection),
+        )
+
+    # SELECT setval('<table>_id_seq', (SELECT COALESCE(MAX(id), 0) FROM "<table>"));
+    @router.put(
+        "/{id}",
+        name=f"update_{resource}_by_id",
+        response_model=read,
+        status_code=status.HTTP_200_OK,
+        responses={
+            status.HTTP_201_CREATED: {"model": None},
+            status.HTTP_204_NO_CONTENT: {"model": None},
+            status.HTTP_409_CONFLICT: {"model": None},
+            status.HTTP_412_PRECONDITION_FAILED: {"model": None},
+        },
+        summary=f"Заменить данные {names.one_of} или создать {new_word}",
+    )
+    async def update_row(
+        id: PathParamId,
+        item: update,
+        response: Response,
+        connection: DbConnection,
+        precondition: IfMatch,
+    ):
+        response.headers["Content-Location"] = location(id)
+
+        # If-Match: заменяем только версию, которую видел клиент
+        if precondition is not None:
+            db_row = await crud.update(
+                item, id, precondition, connection=connection
+            )
+            if db_row is None:
+                return await unchanged(
+                    id,
+                    item.model_dump(),
+                    precondition,
+                    response,
+                    connection,
+                    missing=status.HTTP_412_PRECONDITION_FAILED,
+                )
+
+            table_versions.update(id, db_row)
+            response.headers.update(validators(db_row))
+            return db_row
+
+        db_row, created = await crud.upsert(item, id, connection=connection)
+
+        if db_row is not None:
+            table_versions.update(id, db_row)
+
+        # Если не было, создан новый с таким id
+        if created:
+            headers = {"Location": location(id), **validators(db_row)}
+            return Response(
+                status_code=status.HTTP_201_CREATED, headers=headers
+            )
+
+        if db_row is None:
+            return await unchanged(
+                id,
+                item.model_dump(),
+                None,
+                response,
+                connection,
+                missing=status.HTTP_404_NOT_FOUND,
+            )
+
+        response.headers.update(validators(db_row))
+        return db_row
+
+    @router.delete(
+        "/",
+        name=f"delete_{resource}",
+        response_model=BulkAffected,
+        status_code=status.HTTP_200_OK,
+        responses={
+            status.HTTP_409_CONFLICT: {"model": None},
+        },
+        summary=f"Удалить {names.all}",
+    )
+    async def delete_rows(
+        filters: Annotated[filter, Depends()],
+        params: Annotated[SetParams, Depends()],
+        connection: DbConnection,
+    ):
+        return await apply_to_set(
+            params,
+            partial(crud.count, filters, connection=connection),
+            partial(crud.delete_all, filters, connection=connection),
+        )
+
+    @router.delete(
+        "/{id}",
+        name=f"delete_{resource}_by_id",
+        response_model=None,
+        status_code=status.HTTP_204_NO_CONTENT,
+        responses={
+            status.HTTP_404_NOT_FOUND: {"model": None},
+        },
+        summary=f"Удалить {names.one}",
+    )
+    async def delete_row(id: PathParamId, connection: DbConnection):
+        deleted = await crud.delete(id, connection=connection)
+
+        if not deleted:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+        table_versions.discard(id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    @router.patch(
+        "/",
+        name=f"patch_{resource}",
+        response_model=BulkAffected,
+        status_code=status.HTTP_200_OK,
+        responses={
+            status.HTTP_409_CONFLICT: {"model": None},
+        },
+        summary=f"Изменить данные всех {names.many_of}",
+    )
+    async def patch_rows(
+        item: patch,
+        filters: Annotated[filter, Depends()],
+        params: Annotated[SetParams, Depends()],
+        connection: DbConnection,
+    ):
+        return await apply_to_set(
+            params,
+            partial(crud.count, filters, connection=connection),
+            partial(crud.update_all, item, filters, connection=connection),
+        )
+
+    @router.patch(
+        "/{id}",
+        name=f"patch_{resource}_by_id",
+        response_model=read,
+        status_code=status.HTTP_200_OK,
+        responses={
+            status.HTTP_204_NO_CONTENT: {"model": None},
+            status.HTTP_404_NOT_FOUND: {"model": None},
+            status.HTTP_409_CONFLICT: {"model": None},
+            status.HTTP_412_PRECONDITION_FAILED: {"model": None},
+        },
+        summary=f"Изменить данные {names.one_of}",
+    )
+    async def patch_row(
+        id: PathParamId,
+        item: patch,
+        response: Response,
+        connection: DbConnection,
+        precondition: IfMatch,
+    ):
+        response.headers["Content-Location"] = location(id)
+
+        # Один UPDATE: строка возвращается, только если она есть,
+        # версия совпала с If-Match и значения изменились
+        db_row = await crud.update(
+            item, id, precondition, partial=True, connection=connection
+        )
+
+        if db_row is None:
+            return await unchanged(
+                id,
+                item.model_dump(exclude_unset=True),
+                precondition,
+                response,
+                connection,
+                missing=status.HTTP_404_NOT_FOUND,
+            )
+
+        table_versions.update(id, db_row)
+        response.headers.update(validators(db_row))
+        return db_row
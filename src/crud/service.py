@@ -0,0 +1,286 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Table,
+    and_,
+    bindparam,
+    delete,
+    insert,
+    literal_column,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.bulk import filter_rows
+from src.database import (
+    estimate_count,
+    execute,
+    fetch_all,
+    fetch_one,
+    insert_many,
+    is_changed,
+)
+from src.etags import ConditionalParams, Precondition
+from src.fields import ProjectionParams, select_columns
+from src.loaders import Relation
+from src.pagination import PaginationParams, paginate
+from src.references.service import cache
+
+FilterQuery = Callable[[Select, Any], Select]
+
+
+def check_schemas(
+    table: Table, read: type[BaseModel], writes: list[type[BaseModel]]
+) -> None:
+    # Строки отдаются без валидации response_model (RowsJSONResponse),
+    # поэтому схема чтения должна совпадать с колонками таблицы, а схемы
+    # записи не должны содержать полей, которых в таблице нет
+    columns = set(table.c.keys())
+    problems = []
+    for schema in [read, *writes]:
+        unknown = set(schema.model_fields) - columns
+        if unknown:
+            problems.append(f"{schema.__name__}: нет колонок {sorted(unknown)}")
+
+    missing = columns - set(read.model_fields)
+    if missing:
+        problems.append(f"{read.__name__}: нет полей {sorted(missing)}")
+
+    if problems:
+        raise TypeError(f"Таблица {table.name}: " + "; ".join(problems))
+
+
+@dataclass(frozen=True)
+class RowGuard:
+    # Дополнительное условие записи строки (например, разрешенный
+    # переход состояния) и проверка, объясняющая клиенту отказ
+    columns: frozenset[str]
+    where: Callable[[dict[str, Any]], ColumnElement]
+    check: Callable[[dict[str, Any], dict[str, Any]], None]
+
+
+class CrudService:
+    def __init__(
+        self,
+        table: Table,
+        filter_query: FilterQuery,
+        relations: dict[str, Relation],
+        guard: RowGuard | None = None,
+    ):
+        self.table = table
+        self.filter_query = filter_query
+        self.relations = relations
+        self.guard = guard
+        self.projection_params = ProjectionParams(table, relations)
+        self.conditional_params = ConditionalParams(table)
+
+        # Запросы по id строятся один раз: SQLAlchemy запоминает их ключ
+        # кэша и скомпилированный SQL, на запрос остается только execute
+        id = bindparam("id")
+        self.select_by_id = select(table).where(table.c.id == id)
+        self.delete_by_id = (
+            delete(table).where(table.c.id == id).returning(table.c.id)
+        )
+        self.probe_by_id = select(
+            *select_columns(
+                table,
+                {"version", "updated_at", *(guard.columns if guard else ())},
+            )
+        ).where(table.c.id == id)
+
+    def _guard(self, values: dict[str, Any]) -> ColumnElement:
+        if self.guard is None:
+            return true()
+
+        return self.guard.where(values)
+
+    async def create(
+        self,
+        model: BaseModel,
+        id: int | None = None,
+        connection: AsyncConnection | None = None,
+    ) -> dict[str, Any]:
+        values = model.model_dump()
+
+        await cache.check_references(self.table, values)
+
+        insert_query = insert(self.table).values(values).returning(self.table)
+
+        if id is not None:
+            insert_query = insert_query.values(id=id)
+
+        return await fetch_one(insert_query, connection)
+
+    async def create_many(
+        self,
+        models: list[BaseModel],
+        connection: AsyncConnection | None = None,
+    ) -> list[int]:
+        rows = [model.model_dump() for model in models]
+
+        return await insert_many(self.table, rows, connection)
+
+    async def upsert(
+        self,
+        model: BaseModel,
+        id: int,
+        connection: AsyncConnection | None = None,
+    ) -> tuple[dict[str, Any] | None, bool]:
+        values = model.model_dump()
+
+        await cache.check_references(self.table, values)
+
+        # Один INSERT ... ON CONFLICT вместо SELECT + INSERT/UPDATE.
+        # Строка возвращается, только если она создана или изменилась,
+        # xmax = 0 у только что вставленной строки
+        insert_query = pg_insert(self.table).values(id=id, **values)
+        insert_query = insert_query.on_conflict_do_update(
+            index_elements=[self.table.c.id],
+            set_={key: insert_query.excluded[key] for key in values},
+            where=and_(
+                tuple_(*(self.table.c[key] for key in values)).is_distinct_from(
+                    tuple_(*(insert_query.excluded[key] for key in values))
+                ),
+                self._guard(values),
+            ),
+        ).returning(self.table, literal_column("xmax = 0").label("inserted"))
+
+        db_row = await fetch_one(insert_query, connection)
+
+        if db_row is None:
+            return None, False
+
+        return db_row, db_row.pop("inserted")
+
+    def select_rows(
+        self, filters: Any | None = None, fields: set[str] | None = None
+    ) -> Select:
+        select_query = select(*select_columns(self.table, fields))
+
+        if filters is None:
+            return select_query
+
+        return self.filter_query(select_query, filters)
+
+    async def get_many(
+        self,
+        filters: Any | None = None,
+        sort: str = "id",
+        pagination: PaginationParams | None = None,
+        fields: set[str] | None = None,
+        connection: AsyncConnection | None = None,
+    ) -> list[dict[str, Any]]:
+        select_query = self.select_rows(filters, fields)
+
+        if pagination is not None:
+            select_query = paginate(select_query, self.table, sort, pagination)
+
+        return await fetch_all(select_query, connection)
+
+    async def count(
+        self,
+        filters: Any | None = None,
+        connection: AsyncConnection | None = None,
+    ) -> int:
+        return await estimate_count(self.select_rows(filters), connection)
+
+    async def get_by_id(
+        self,
+        id: int,
+        fields: set[str] | None = None,
+        connection: AsyncConnection | None = None,
+    ) -> dict[str, Any] | None:
+        if fields is None:
+            return await fetch_one(self.select_by_id, connection, {"id": id})
+
+        select_query = select(*select_columns(self.table, fields)).where(
+            self.table.c.id == id
+        )
+
+        return await fetch_one(select_query, connection)
+
+    async def probe(
+        self, id: int, connection: AsyncConnection | None = None
+    ) -> dict[str, Any] | None:
+        # Версия и поля условия записи: по ним выбирается ответ,
+        # если UPDATE не вернул строку
+        return await fetch_one(self.probe_by_id, connection, {"id": id})
+
+    async def update(
+        self,
+        model: BaseModel,
+        id: int,
+        precondition: Precondition | None = None,
+        partial: bool = False,
+        connection: AsyncConnection | None = None,
+    ) -> dict[str, Any] | None:
+        # PUT заменяет строку целиком, PATCH меняет только переданные поля
+        values = model.model_dump(exclude_unset=partial)
+
+        await cache.check_references(self.table, values)
+
+        update_query = (
+            update(self.table)
+            .where(
+                self.table.c.id == id,
+                is_changed(self.table, values),
+                self._guard(values),
+            )
+            .values(values)
+            .returning(self.table)
+        )
+
+        # If-Match: строка обновляется, только если версия не изменилась
+        if precondition is not None and precondition.versions is not None:
+            update_query = update_query.where(
+                tuple_(self.table.c.version, self.table.c.updated_at).in_(
+                    precondition.versions
+                )
+            )
+
+        return await fetch_one(update_query, connection)
+
+    async def update_all(
+        self,
+        model: BaseModel,
+        filters: Any | None = None,
+        connection: AsyncConnection | None = None,
+    ) -> int:
+        values = model.model_dump(exclude_unset=True)
+
+        await cache.check_references(self.table, values)
+
+        update_query = (
+            update(self.table).where(self._guard(values)).values(values)
+        )
+        update_query = filter_rows(
+            update_query, self.table, self.select_rows(filters)
+        )
+
+        return await execute(update_query, connection)
+
+    async def delete(
+        self, id: int, connection: AsyncConnection | None = None
+    ) -> bool:
+        db_row = await fetch_one(self.delete_by_id, connection, {"id": id})
+
+        return db_row is not None
+
+    async def delete_all(
+        self,
+        filters: Any | None = None,
+        connection: AsyncConnection | None = None,
+    ) -> int:
+        delete_query = filter_rows(
+            delete(self.table), self.table, self.select_rows(filters)
+        )
+
+        return await execute(delete_query, connection)
@@ -1,29 +1,368 @@
-from typing import Any
+import json
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Annotated, Any, AsyncIterator, Iterator, TypeAlias
 
-from sqlalchemy import CursorResult, Delete, Insert, Select, Update
-from sqlalchemy.ext.asyncio import create_async_engine
+from fastapi import Depends
+from sqlalchemy import (
+    ColumnElement,
+    CursorResult,
+    Delete,
+    Insert,
+    Select,
+    Table,
+    Update,
+    event,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
 
 from src.config import settings
+from src.metrics.service import Histogram, Metric, registry
 
-engine = create_async_engine(settings.DATABASE_URL.unicode_string(), echo=True)
+engine = create_async_engine(
+    settings.DATABASE_URL.unicode_string(),
+    echo=settings.DB_ECHO,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+
+class PoolStats:
+    # Верхние границы корзин гистограммы ожидания соединения, в секундах
+    WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.checkins = 0
+        self.wait = Histogram(self.WAIT_BUCKETS)
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait.observe(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = engine.pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "wait_seconds_sum": self.wait.sum,
+            "wait_seconds_buckets": self.wait.snapshot()["buckets"],
+        }
+
+    def metrics(self) -> list[Metric]:
+        snapshot = self.snapshot()
+
+        size = Metric("db_pool_size", "gauge", "Постоянный размер пула")
+        size.add(snapshot["size"])
+
+        connections = Metric(
+            "db_pool_connections", "gauge", "Соединения пула по состоянию"
+        )
+        for state in ("checked_in", "checked_out", "overflow"):
+            connections.add(snapshot[state], state=state)
+
+        checkouts = Metric(
+            "db_pool_checkouts_total", "counter", "Выдачи соединений из пула"
+        )
+        checkouts.add(self.checkouts)
+
+        wait = Metric(
+            "db_pool_wait_seconds",
+            "histogram",
+            "Ожидание соединения из пула, сек.",
+        )
+        wait.add_histogram(self.wait)
+
+        return [size, connections, checkouts, wait]
+
+
+pool_stats = PoolStats()
+registry.register(pool_stats.metrics)
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(*args) -> None:
+    pool_stats.checkouts += 1
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(*args) -> None:
+    pool_stats.checkins += 1
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, budget: int, queries: int) -> None:
+        super().__init__(
+            f"Превышен бюджет запросов к БД: {queries} при бюджете {budget}"
+        )
+        self.budget = budget
+        self.queries = queries
+
+
+class QueryStats:
+    def __init__(self, debug: bool = False) -> None:
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.budget = settings.DB_QUERY_BUDGET
+        # Только в режиме отладки: тексты запросов и медленные запросы
+        # с параметрами, для отчета по запросу (см. src/queries.py)
+        self.debug = debug
+        self.statements: Counter[str] = Counter()
+        self.slow: list[tuple[str, Any, float]] = []
+
+    def check_budget(self) -> None:
+        if not self.debug or not settings.DB_QUERY_BUDGET_STRICT:
+            return
+        if self.budget is not None and self.queries >= self.budget:
+            # Запрос, который превысил бюджет, не выполняется
+            raise QueryBudgetExceeded(self.budget, self.queries + 1)
+
+    def observe(
+        self,
+        seconds: float,
+        rows: int,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+    ) -> None:
+        self.queries += 1
+        self.rows += max(rows, 0)
+        self.seconds += seconds
+
+        if not self.debug:
+            return
+        self.statements[statement] += 1
+        if not executemany and seconds * 1000 >= settings.DB_SLOW_QUERY_MS:
+            self.slow.append((statement, parameters, seconds))
+
+
+# Запросы к БД относятся к текущему HTTP-запросу (см. src/instrumentation.py).
+# Контекст доходит до событий движка через greenlet SQLAlchemy
+query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "query_stats", default=None
+)
+
+
+@contextmanager
+def untracked_queries() -> Iterator[None]:
+    # Запросы не относятся к HTTP-запросу и не идут в его бюджет:
+    # например, перечитывание кэша справочников после NOTIFY
+    token = query_stats.set(None)
+    try:
+        yield
+    finally:
+        query_stats.reset(token)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, *args) -> None:
+    stats = query_stats.get()
+    if stats is not None:
+        stats.check_budget()
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    seconds = time.perf_counter() - conn.info["query_started"].pop()
+    stats = query_stats.get()
+    if stats is not None:
+        stats.observe(
+            seconds, cursor.rowcount, statement, parameters, executemany
+        )
+
+
+@asynccontextmanager
+async def begin() -> AsyncIterator[AsyncConnection]:
+    started = time.perf_counter()
+    async with engine.connect() as conn:
+        pool_stats.observe_wait(time.perf_counter() - started)
+        async with conn.begin():
+            yield conn
+
+
+async def get_db_connection() -> AsyncIterator[AsyncConnection]:
+    # Одно соединение и одна транзакция на весь запрос
+    async with begin() as connection:
+        yield connection
+
+
+DbConnection: TypeAlias = Annotated[AsyncConnection, Depends(get_db_connection)]
+
+
+def query_budget(queries: int) -> Any:
+    # Зависимость маршрута: сколько запросов к БД ему положено
+    def set_budget() -> None:
+        stats = query_stats.get()
+        if stats is not None:
+            stats.budget = queries
+
+    return Depends(set_budget)
 
 
 async def fetch_one(
-    query: Select | Insert | Update | Delete
+    query: Select | Insert | Update | Delete,
+    connection: AsyncConnection | None = None,
+    params: dict[str, Any] | None = None,
 ) -> dict[str, Any] | None:
-    async with engine.begin() as conn:
-        cursor: CursorResult = await conn.execute(query)
-        return cursor.first()._asdict() if cursor.rowcount > 0 else None
+    if connection is None:
+        async with begin() as connection:
+            return await fetch_one(query, connection, params)
+
+    cursor: CursorResult = await connection.execute(query, params)
+    return cursor.first()._asdict() if cursor.rowcount > 0 else None
 
 
 async def fetch_all(
-    query: Select | Insert | Update | Delete
+    query: Select | Insert | Update | Delete,
+    connection: AsyncConnection | None = None,
+    params: dict[str, Any] | None = None,
 ) -> list[dict[str, Any]]:
-    async with engine.begin() as conn:
-        cursor: CursorResult = await conn.execute(query)
-        return [r._asdict() for r in cursor.all()]
+    if connection is None:
+        async with begin() as connection:
+            return await fetch_all(query, connection, params)
+
+    cursor: CursorResult = await connection.execute(query, params)
+    return [r._asdict() for r in cursor.all()]
+
+
+async def execute(
+    query: Insert | Update | Delete,
+    connection: AsyncConnection | None = None,
+) -> int:
+    if connection is None:
+        async with begin() as connection:
+            return await execute(query, connection)
+
+    cursor: CursorResult = await connection.execute(query)
+    return cursor.rowcount
+
+
+def is_changed(table: Table, values: dict[str, Any]) -> ColumnElement:
+    # (cols) IS DISTINCT FROM (values): UPDATE не трогает строку
+    # и ничего не возвращает, если значения те же
+    return tuple_(*(table.c[key] for key in values)).is_distinct_from(
+        tuple_(
+            *(
+                literal(value, table.c[key].type)
+                for key, value in values.items()
+            )
+        )
+    )
+
+
+async def insert_many(
+    table: Table,
+    rows: list[dict[str, Any]],
+    connection: AsyncConnection | None = None,
+) -> list[int]:
+    if not rows:
+        return []
+
+    if connection is None:
+        async with begin() as connection:
+            return await insert_many(table, rows, connection)
+
+    # Небольшие пачки одним многострочным INSERT
+    if len(rows) < settings.DB_COPY_THRESHOLD:
+        cursor: CursorResult = await connection.execute(
+            insert(table).values(rows).returning(table.c.id)
+        )
+        return list(cursor.scalars())
+
+    # COPY не умеет RETURNING, поэтому id берутся из последовательности заранее
+    ids = await reserve_ids(table, len(rows), connection)
+
+    columns = list(rows[0])
+    records = [
+        (id, *(row[column] for column in columns)) for id, row in zip(ids, rows)
+    ]
+    await copy_records(table, ["id", *columns], records, connection)
+
+    return ids
+
+
+async def reserve_ids(
+    table: Table, count: int, connection: AsyncConnection
+) -> list[int]:
+    table_name = connection.dialect.identifier_preparer.format_table(table)
+    sequence = func.pg_get_serial_sequence(table_name, "id")
+    cursor: CursorResult = await connection.execute(
+        select(func.nextval(sequence)).select_from(
+            func.generate_series(1, count)
+        )
+    )
+    return list(cursor.scalars())
+
+
+async def copy_records(
+    table: Table,
+    columns: list[str],
+    records: list[tuple],
+    connection: AsyncConnection,
+) -> None:
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name,
+        records=[tuple(map(_copy_value, record)) for record in records],
+        columns=columns,
+    )
+
+
+def _copy_value(value: Any) -> Any:
+    # Бинарный COPY asyncpg ждет Decimal для numeric
+    return Decimal(str(value)) if isinstance(value, float) else value
+
+
+async def stream_rows(
+    query: Select, batch_size: int = 1000
+) -> AsyncIterator[list[dict[str, Any]]]:
+    # Серверный курсор asyncpg: в памяти не больше batch_size строк.
+    # Соединение свое, а не из запроса, потому что тело ответа
+    # отдается уже после закрытия зависимостей
+    async with begin() as connection:
+        result = await connection.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions(batch_size):
+            yield [r._asdict() for r in partition]
+
+
+async def estimate_count(
+    query: Select,
+    connection: AsyncConnection | None = None,
+) -> int:
+    # Оценка планировщика вместо COUNT(*): таблица не читается
+    if connection is None:
+        async with begin() as connection:
+            return await estimate_count(query, connection)
 
+    compiled = query.compile(
+        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    cursor: CursorResult = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}"
+    )
+    plan = cursor.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
 
-async def execute(query: Insert | Update | Delete) -> None:
-    async with engine.begin() as conn:
-        await conn.execute(query)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -9,13 +9,13 @@ from sqlalchemy import (
     Text,
 )
 
-from src.models import Base
+from src.models import Base, row_version_columns
 
 decision = Table(
     "decision",
     Base.metadata,
     Column("id", Integer),
-    Column("support_id", Integer),
+    Column("support_id", Integer, index=True),
     Column(
         "decision_type",
         Enum("EG", "MVK", name="decision_type"),
@@ -36,6 +36,7 @@ decision = Table(
         Text,
         comment="Решение. Заполняет сотрудник. Источник протокол заседания. По итогам проведения комиссии",
     ),
+    *row_version_columns(),
     ForeignKeyConstraint(
         ["support_id"], ["support.id"], name="decision_support_id_fkey"
     ),
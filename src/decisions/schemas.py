@@ -1,12 +1,14 @@
+from dataclasses import dataclass
 from datetime import date
-from typing import Literal
+from typing import Annotated, Literal
 
+from fastapi import Query
 from pydantic import (
     Field,
     field_validator,
 )
 
-from src.schemas import BasePatchSchema, BaseSchema
+from src.schemas import BasePatchSchema, BaseSchema, VersionedSchema
 
 DecisionType = Literal["EG", "MVK"]
 
@@ -43,7 +45,7 @@ class DecisionUpdate(DecisionBase):
     pass
 
 
-class Decision(DecisionBase):
+class Decision(DecisionBase, VersionedSchema):
     id: int
 
 
@@ -65,3 +67,21 @@ class DecisionPatch(DecisionBase, BasePatchSchema):
         default=None,
         description="Решение. Заполняет сотрудник. Источник протокол заседания. По итогам проведения комиссии",
     )
+
+
+DecisionSort = Literal["id", "-id", "decision_date", "-decision_date"]
+
+
+@dataclass
+class DecisionFilter:
+    support_id: Annotated[int | None, Query(description="ID поддержки")] = None
+    project_id: Annotated[int | None, Query(description="ID проекта")] = None
+    decision_type: Annotated[
+        list[DecisionType] | None, Query(description="Вид решения")
+    ] = None
+    decision_date_from: Annotated[
+        date | None, Query(description="Дата создания решения, с")
+    ] = None
+    decision_date_to: Annotated[
+        date | None, Query(description="Дата создания решения, по")
+    ] = None
@@ -0,0 +1,267 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated, Any, TypeAlias
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from sqlalchemy import Table
+
+from src.metrics.service import Metric, registry
+from src.notifications import notifications
+
+# Канал, в который пишут триггеры таблиц с версиями (см. миграцию)
+CHANNEL = "row_changed"
+
+MAX_CACHED_ROWS = 100_000
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# Версия строки и время изменения в микросекундах. Одной версии мало:
+# строка, удаленная и созданная заново с тем же id, снова получает
+# версию 1, а время создания у нее другое
+Validator: TypeAlias = tuple[int, datetime]
+
+
+def etag(version: int, updated_at: datetime) -> str:
+    return f'"{version}-{(updated_at - EPOCH) // MICROSECOND}"'
+
+
+def _parse_validator(tag: str) -> Validator | None:
+    version, _, micros = tag.strip('"').partition("-")
+    if not (version.isdigit() and micros.isdigit()):
+        return None
+    return int(version), EPOCH + int(micros) * MICROSECOND
+
+
+def validators(row: dict[str, Any]) -> dict[str, str]:
+    updated_at = row["updated_at"].astimezone(timezone.utc)
+    return {
+        "ETag": etag(row["version"], row["updated_at"]),
+        "Last-Modified": format_datetime(updated_at, usegmt=True),
+    }
+
+
+def _parse_etags(value: str, weak: bool) -> set[str]:
+    tags = set()
+    for tag in value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            if not weak:
+                continue
+            tag = tag[2:]
+        tags.add(tag)
+    return tags
+
+
+class TableVersions:
+    def __init__(self) -> None:
+        self.rows: dict[int, tuple[int, datetime]] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, id: int) -> tuple[int, datetime] | None:
+        # Без соединения LISTEN сброс по изменениям не придет,
+        # кэшу верить нельзя
+        cached = None
+        if notifications.listener is not None:
+            cached = self.rows.get(id)
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    def set(self, id: int, row: dict[str, Any], generation: int) -> None:
+        # Строка прочитана до уведомления об изменении таблицы,
+        # ее версия могла уже устареть
+        if generation != self.generation:
+            return
+        self.update(id, row)
+
+    def update(self, id: int, row: dict[str, Any]) -> None:
+        # Строка, записанная этим воркером: ее версия известна сразу,
+        # без ожидания уведомления
+        if notifications.listener is None:
+            return
+        if len(self.rows) >= MAX_CACHED_ROWS:
+            self.rows.clear()
+        self.rows[id] = (row["version"], row["updated_at"])
+
+    def discard(self, id: int) -> None:
+        self.rows.pop(id, None)
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self.rows.clear()
+
+
+class VersionCache:
+    def __init__(self, table_names: list[str]) -> None:
+        self.tables = {name: TableVersions() for name in table_names}
+        notifications.subscribe(CHANNEL, self.invalidate)
+
+    def invalidate(self, table_name: str | None = None) -> None:
+        for name, table_versions in self.tables.items():
+            if table_name is None or name == table_name:
+                table_versions.invalidate()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "rows": len(table_versions.rows),
+                "hits": table_versions.hits,
+                "misses": table_versions.misses,
+            }
+            for name, table_versions in self.tables.items()
+        }
+
+    def metrics(self) -> list[Metric]:
+        rows = Metric(
+            "version_cache_rows", "gauge", "Строк с известной версией"
+        )
+        hits = Metric(
+            "version_cache_hits_total",
+            "counter",
+            "Условные запросы, версия найдена в памяти",
+        )
+        misses = Metric(
+            "version_cache_misses_total",
+            "counter",
+            "Условные запросы с чтением из БД",
+        )
+
+        for name, stats in self.stats().items():
+            rows.add(stats["rows"], table=name)
+            hits.add(stats["hits"], table=name)
+            misses.add(stats["misses"], table=name)
+
+        return [rows, hits, misses]
+
+
+versions = VersionCache(["project", "support", "decision", "address", "user"])
+registry.register(versions.metrics)
+
+
+class Conditional:
+    def __init__(
+        self,
+        table_versions: TableVersions,
+        if_none_match: str | None,
+        if_modified_since: str | None,
+        enabled: bool,
+    ):
+        self.table_versions = table_versions
+        self.generation = table_versions.generation
+        self.if_none_match = if_none_match
+        self.if_modified_since = if_modified_since
+        self.enabled = enabled
+
+    def not_modified(self, version: int, updated_at: datetime) -> bool:
+        if not self.enabled:
+            return False
+
+        # If-None-Match важнее If-Modified-Since (RFC 9110, 13.2.2)
+        if self.if_none_match is not None:
+            tags = _parse_etags(self.if_none_match, weak=True)
+            return "*" in tags or etag(version, updated_at) in tags
+
+        if self.if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(self.if_modified_since)
+                # Дата с зоной -0000 разбирается без tzinfo, это UTC
+                if since.tzinfo is None:
+                    since = since.replace(tzinfo=timezone.utc)
+                return updated_at.replace(microsecond=0) <= since
+            except (TypeError, ValueError):
+                return False
+
+        return False
+
+    def respond(self, id: int, row: dict[str, Any], headers: Any) -> bool:
+        # Ставит ETag и Last-Modified, возвращает True, если клиенту
+        # можно ответить 304
+        if not self.enabled:
+            return False
+
+        self.table_versions.set(id, row, self.generation)
+        headers.update(validators(row))
+        return self.not_modified(row["version"], row["updated_at"])
+
+
+class ConditionalParams:
+    def __init__(self, table: Table):
+        self.table = table
+
+    def __call__(
+        self,
+        request: Request,
+        if_none_match: Annotated[str | None, Header()] = None,
+        if_modified_since: Annotated[str | None, Header()] = None,
+    ) -> Conditional:
+        # Частичное представление (fields, include) не кэшируется:
+        # его ETag не отражал бы изменения связанных строк
+        enabled = not {"fields", "include"} & request.query_params.keys()
+        conditional = Conditional(
+            versions.tables[self.table.name],
+            if_none_match,
+            if_modified_since,
+            enabled,
+        )
+
+        id = request.path_params.get("id", "")
+        if not enabled or not id.isdigit():
+            return conditional
+        if if_none_match is None and if_modified_since is None:
+            return conditional
+
+        # Версия из памяти: 304 без обращения к БД
+        cached = conditional.table_versions.get(int(id))
+        if cached is not None and conditional.not_modified(*cached):
+            version, updated_at = cached
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=validators(
+                    {"version": version, "updated_at": updated_at}
+                ),
+            )
+
+        return conditional
+
+
+@dataclass
+class Precondition:
+    # None: If-Match: *, подходит любая существующая версия
+    versions: set[Validator] | None
+
+    def matches(self, row: dict[str, Any]) -> bool:
+        return (
+            self.versions is None
+            or (row["version"], row["updated_at"]) in self.versions
+        )
+
+
+def get_precondition(
+    if_match: Annotated[
+        str | None,
+        Header(description="ETag, полученный при чтении строки"),
+    ] = None,
+) -> Precondition | None:
+    if if_match is None:
+        return None
+
+    tags = _parse_etags(if_match, weak=False)
+    if "*" in tags:
+        return Precondition(None)
+
+    accepted = set()
+    for tag in tags:
+        validator = _parse_validator(tag)
+        if validator is not None:
+            accepted.add(validator)
+
+    return Precondition(accepted)
+
+
+IfMatch: TypeAlias = Annotated[Precondition | None, Depends(get_precondition)]
@@ -0,0 +1,69 @@
+import csv
+import io
+from typing import Annotated, Any, AsyncIterator, Literal, TypeAlias
+
+import orjson
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from src.database import stream_rows
+from src.responses import dumps
+
+ExportFormat = Literal["ndjson", "csv"]
+
+ExportFormatParam: TypeAlias = Annotated[
+    ExportFormat, Query(description="Формат выгрузки")
+]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def ndjson_chunks(
+    batches: AsyncIterator[list[dict[str, Any]]]
+) -> AsyncIterator[bytes]:
+    # Значения сериализуются так же, как в ответах API
+    async for rows in batches:
+        yield b"".join(dumps(row, orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+async def csv_chunks(
+    batches: AsyncIterator[list[dict[str, Any]]], columns: list[str]
+) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    async for rows in batches:
+        writer.writerows([row[column] for column in columns] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Заголовок пустой выгрузки
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(
+    query: Select, format: ExportFormat, filename: str
+) -> StreamingResponse:
+    # StreamingResponse ждет отправки каждого куска, поэтому медленный
+    # клиент притормаживает чтение курсора, а не копит данные в памяти
+    batches = stream_rows(query)
+
+    if format == "csv":
+        columns = list(query.selected_columns.keys())
+        content = csv_chunks(batches, columns)
+    else:
+        content = ndjson_chunks(batches)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{format}"'
+    }
+    return StreamingResponse(
+        content, media_type=MEDIA_TYPES[format], headers=headers
+    )
@@ -0,0 +1,94 @@
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Column, Table
+
+from src.loaders import Relation, RequestLoaders, load_relations
+
+
+def _split(value: str | None) -> set[str]:
+    if value is None:
+        return set()
+
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def _check(names: set[str], allowed: Any, detail: str) -> None:
+    unknown = names.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{detail}: {', '.join(sorted(unknown))}",
+        )
+
+
+def select_columns(table: Table, fields: set[str] | None) -> list[Column]:
+    if fields is None:
+        return list(table.c)
+
+    return [c for c in table.c if c.name in fields or c.name == "id"]
+
+
+class Projection:
+    def __init__(
+        self,
+        fields: set[str] | None,
+        include: set[str],
+        relations: dict[str, Relation],
+        loaders: RequestLoaders,
+    ):
+        self.fields = fields
+        self.include = include
+        self.relations = relations
+        self.loaders = loaders
+
+    def columns(self, *keys: str) -> set[str] | None:
+        # Кроме запрошенных полей читаются id, ключ сортировки и ключи
+        # связей из include, лишнее потом убирается из ответа
+        if self.fields is None:
+            return None
+
+        relation_keys = {self.relations[name].key for name in self.include}
+        return self.fields | relation_keys | {"id", *keys}
+
+    async def apply(self, rows: list[dict[str, Any]]) -> None:
+        await load_relations(rows, self.relations, self.include, self.loaders)
+
+        if self.fields is None:
+            return
+
+        keep = self.fields | self.include | {"id"}
+        for row in rows:
+            for key in row.keys() - keep:
+                del row[key]
+
+
+class ProjectionParams:
+    def __init__(self, table: Table, relations: dict[str, Relation]):
+        self.table = table
+        self.relations = relations
+
+    def __call__(
+        self,
+        loaders: RequestLoaders,
+        fields: Annotated[
+            str | None,
+            Query(description="Поля ответа через запятую, id есть всегда"),
+        ] = None,
+        include: Annotated[
+            str | None,
+            Query(description="Связанные объекты через запятую"),
+        ] = None,
+    ) -> Projection:
+        field_names = _split(fields)
+        _check(field_names, self.table.c.keys(), "Неизвестные поля")
+
+        include_names = _split(include)
+        _check(include_names, self.relations, "Неизвестные связи")
+
+        return Projection(
+            field_names if fields is not None else None,
+            include_names,
+            self.relations,
+            loaders,
+        )
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from src.imports.service import run_import
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.imports",
+        description="Импорт проектов из Excel (.xlsx) или CSV",
+    )
+    parser.add_argument("source", type=Path, help="Файл .xlsx или .csv")
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Строк в одной пачке COPY"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Файл контрольной точки: фиксировать каждую пачку и "
+        "продолжать с места остановки",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    progress = asyncio.run(
+        run_import(args.source, args.batch_size, args.checkpoint)
+    )
+
+    print(
+        f"Загружено {progress.rows_loaded} из {progress.rows_read} строк, "
+        f"ошибок {progress.rows_failed}, "
+        f"владельцев создано {progress.owners_created}, "
+        f"найдено {progress.owners_reused}, "
+        f"{progress.rows_per_second:.0f} строк/с"
+    )
+    for error in progress.errors:
+        print(f"Строка {error['row']}: {error['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from src.admin import AdminOnly
+from src.config import settings
+from src.imports import service
+from src.imports.schemas import ImportJob
+
+logger = logging.getLogger(__name__)
+
+# Импорт пишет COPY прямо в таблицы, в обход проверок API
+router = APIRouter(prefix="/imports", tags=["Импорт"], dependencies=[AdminOnly])
+
+# Задачи живут в памяти воркера, который принял файл
+jobs: dict[str, service.ImportProgress] = {}
+tasks: set[asyncio.Task] = set()
+
+
+def _evict_finished() -> None:
+    expired = time.monotonic() - settings.IMPORT_JOB_TTL
+    for job_id, progress in list(jobs.items()):
+        if progress.finished_at is not None and progress.finished_at < expired:
+            del jobs[job_id]
+
+
+async def _run(job_id: str, source: Path, batch_size: int) -> None:
+    progress = jobs[job_id]
+    try:
+        await service.run_import(source, batch_size, progress=progress)
+    except Exception:
+        # Причина уже в progress.error, исключение задачи никто не ждет
+        logger.exception("Импорт %s завершился ошибкой", progress.source)
+    finally:
+        source.unlink(missing_ok=True)
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Файл больше {settings.IMPORT_MAX_BYTES} байт",
+    )
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Загрузить файл Excel или CSV с проектами",
+)
+async def create_import(
+    request: Request,
+    format: Annotated[
+        Literal["xlsx", "csv"], Query(description="Формат файла в теле запроса")
+    ] = "xlsx",
+    batch_size: Annotated[
+        int, Query(ge=100, le=50_000, description="Строк в одной пачке COPY")
+    ] = 5000,
+):
+    # Content-Length проверяется до чтения тела, но клиент может его не
+    # передать, поэтому размер считается и при записи
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > settings.IMPORT_MAX_BYTES:
+        raise _too_large()
+
+    _evict_finished()
+    # Каждый импорт держит соединение из пула до конца загрузки
+    running = sum(progress.status == "running" for progress in jobs.values())
+    if running >= settings.IMPORT_MAX_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много импортов одновременно",
+        )
+
+    # Тело пишется на диск потоком, файл целиком в память не читается.
+    # Запись на диск идет в потоке, чтобы не блокировать цикл событий
+    file = tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False)
+    source = Path(file.name)
+
+    # Задача занимает место в лимите, пока файл еще загружается
+    job_id = uuid.uuid4().hex
+    jobs[job_id] = service.ImportProgress(source=source.name)
+    try:
+        with file:
+            size = 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.IMPORT_MAX_BYTES:
+                    raise _too_large()
+                await asyncio.to_thread(file.write, chunk)
+    except BaseException:
+        del jobs[job_id]
+        source.unlink(missing_ok=True)
+        raise
+
+    task = asyncio.create_task(_run(job_id, source, batch_size))
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+
+    headers = {"Location": f"{router.prefix}/{job_id}"}
+    return Response(status_code=status.HTTP_202_ACCEPTED, headers=headers)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=ImportJob,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": None},
+    },
+    summary="Получить состояние импорта",
+)
+async def get_import(job_id: str):
+    if job_id not in jobs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    progress = jobs[job_id]
+    return {
+        "id": job_id,
+        **vars(progress),
+        "rows_per_second": progress.rows_per_second,
+    }
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+
+
+class ImportRowError(BaseModel):
+    row: int = Field(description="Номер строки в файле")
+    error: str = Field(description="Описание ошибки")
+
+
+class ImportJob(BaseModel):
+    id: str
+    source: str = Field(description="Имя загруженного файла")
+    status: str = Field(description="running, done или failed")
+    rows_read: int = Field(description="Прочитано строк")
+    rows_loaded: int = Field(description="Загружено строк")
+    rows_failed: int = Field(description="Строк с ошибками")
+    rows_skipped: int = Field(description="Пропущено по контрольной точке")
+    owners_created: int = Field(description="Создано владельцев")
+    owners_reused: int = Field(description="Найдено владельцев по ИНН/ОГРН")
+    rows_per_second: float = Field(description="Скорость загрузки, строк/с")
+    errors: list[ImportRowError] = Field(
+        description="Первые ошибки разбора строк"
+    )
+    error: str | None = Field(description="Причина сбоя импорта")
@@ -0,0 +1,556 @@
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Iterator
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Enum, Table, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.addresses.models import address
+from src.addresses.schemas import AddressCreate
+from src.database import copy_records, engine, reserve_ids
+from src.decisions.models import decision
+from src.decisions.schemas import DecisionCreate
+from src.models import (
+    business_man,
+    business_org,
+    industry,
+    owner,
+    owner_contact,
+)
+from src.projects.models import project
+from src.projects.schemas import ProjectCreate
+from src.references.service import cache as references_cache
+from src.supports.models import support
+from src.supports.schemas import SupportCreate
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 100
+
+# Заголовок колонки в Excel -> (таблица, колонка).
+# Кроме них понимаются заголовки вида "project.name"
+COLUMN_MAP: dict[str, tuple[Table, str]] = {
+    "название проекта": (project, "name"),
+    "собственная сумма": (project, "application_own_amount"),
+    "запрашиваемая сумма": (project, "application_support_amount"),
+    "количество рабочих мест": (project, "work_place_count"),
+    "налоги": (project, "nalog_amount"),
+    "описание проекта": (project, "description"),
+    "состояние проекта": (project, "state"),
+    "наименование организации": (business_org, "name"),
+    "сокращенное наименование": (business_org, "name_short"),
+    "фамилия": (business_man, "last_name"),
+    "имя": (business_man, "first_name"),
+    "отчество": (business_man, "middle_name"),
+    "инн": (business_org, "inn"),
+    "огрн": (business_org, "ogrn"),
+    "телефон": (owner_contact, "phone_no"),
+    "email": (owner_contact, "email"),
+    "почтовый индекс": (address, "post_code"),
+    "адрес": (address, "address"),
+    "вид поддержки": (support, "type_code"),
+    "размер поддержки": (support, "amount"),
+    "единицы измерения": (support, "unit"),
+    "дата начала поддержки": (support, "date_start"),
+    "дата окончания поддержки": (support, "date_end"),
+    "описание поддержки": (support, "desc"),
+    "вид решения": (decision, "decision_type"),
+    "дата решения": (decision, "decision_date"),
+    "номер протокола": (decision, "protocol_number"),
+    "решение": (decision, "decision"),
+}
+
+INDUSTRY_HEADER = "отрасль"
+
+# COPY идет в обход API, поэтому значения проверяются и нормализуются
+# валидаторами полей тех же схем (регистр названий, ограничения)
+SCHEMAS: dict[Table, type[BaseModel]] = {
+    project: ProjectCreate,
+    address: AddressCreate,
+    support: SupportCreate,
+    decision: DecisionCreate,
+}
+
+TABLES = {
+    table.name: table
+    for table in (
+        address,
+        business_org,
+        business_man,
+        owner,
+        owner_contact,
+        project,
+        support,
+        decision,
+    )
+}
+
+# Порядок загрузки соблюдает внешние ключи
+COPY_COLUMNS: dict[Table, list[str]] = {
+    address: ["id", "post_code", "address"],
+    business_org: ["id", "address_id", "name", "name_short", "inn", "ogrn"],
+    business_man: [
+        "id",
+        "address_id",
+        "last_name",
+        "first_name",
+        "middle_name",
+        "inn",
+        "ogrn",
+    ],
+    owner: ["id", "business_org_id", "business_man_id"],
+    owner_contact: ["id", "owner_id", "phone_no", "email"],
+    project: [
+        "id",
+        "owner_id",
+        "address_id",
+        "industry_id",
+        "name",
+        "application_own_amount",
+        "application_support_amount",
+        "work_place_count",
+        "nalog_amount",
+        "description",
+        "state",
+    ],
+    support: [
+        "id",
+        "project_id",
+        "date_start",
+        "date_end",
+        "type_code",
+        "amount",
+        "unit",
+        "desc",
+    ],
+    decision: [
+        "id",
+        "support_id",
+        "decision_type",
+        "decision_date",
+        "protocol_number",
+        "decision",
+    ],
+}
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportProgress:
+    source: str
+    status: str = "running"
+    rows_read: int = 0
+    rows_loaded: int = 0
+    rows_failed: int = 0
+    rows_skipped: int = 0
+    owners_created: int = 0
+    owners_reused: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return self.rows_read / elapsed if elapsed > 0 else 0.0
+
+    def add_error(self, row_number: int, message: str) -> None:
+        self.rows_failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+
+def read_rows(path: Path) -> Iterator[dict[str, Any]]:
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8-sig") as file:
+            yield from csv.DictReader(file, delimiter=_sniff_delimiter(file))
+        return
+
+    # openpyxl нужен только для импорта, поэтому импортируется здесь
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(h) if h is not None else "" for h in next(rows, [])]
+        for values in rows:
+            yield dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+
+def _sniff_delimiter(file) -> str:
+    sample = file.read(4096)
+    file.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+    except csv.Error:
+        return ","
+
+
+# Пустые экземпляры схем: в них проверяется по одному полю
+_MODELS = {table: schema.model_construct() for table, schema in SCHEMAS.items()}
+
+
+def _validate(table: Table, column: str, value: Any) -> Any:
+    model = _MODELS.get(table)
+    if model is None or column not in SCHEMAS[table].model_fields:
+        return value
+
+    try:
+        model.__pydantic_validator__.validate_assignment(model, column, value)
+    except ValidationError as e:
+        raise RowError(
+            f"{table.name}.{column}: некорректное значение {value!r} "
+            f"({e.errors()[0]['msg']})"
+        )
+
+    # Из схемы берутся только строки: числа остаются Decimal для numeric
+    validated = getattr(model, column)
+    return validated if isinstance(value, str) else value
+
+
+def _convert(table: Table, column: str, value: Any) -> Any:
+    value = _parse(table, column, value)
+    if value is None:
+        return None
+    return _validate(table, column, value)
+
+
+def _parse(table: Table, column: str, value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or value == "":
+        return None
+
+    column_type = table.c[column].type
+    try:
+        if isinstance(column_type, Enum):
+            value = str(value).upper()
+            if value not in column_type.enums:
+                raise ValueError
+            return value
+
+        python_type = column_type.python_type
+        if python_type is date:
+            if isinstance(value, datetime):
+                return value.date()
+            if isinstance(value, date):
+                return value
+            for date_format in ("%d.%m.%Y", "%Y-%m-%d"):
+                try:
+                    return datetime.strptime(value, date_format).date()
+                except ValueError:
+                    pass
+            raise ValueError
+        if python_type is Decimal:
+            return Decimal(str(value).replace(" ", "").replace(",", "."))
+        if python_type is int:
+            return int(Decimal(str(value).replace(" ", "")))
+        # Excel отдает числовые ячейки (ИНН, ОГРН, индекс) как float,
+        # str() дал бы "7701234567.0"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    except (ValueError, InvalidOperation):
+        raise RowError(
+            f"{table.name}.{column}: некорректное значение {value!r}"
+        )
+
+
+class Importer:
+    def __init__(
+        self,
+        connection: AsyncConnection,
+        progress: ImportProgress,
+        batch_size: int,
+    ) -> None:
+        self.connection = connection
+        self.progress = progress
+        self.batch_size = batch_size
+
+        # Хэш-индексы в памяти: ИНН/ОГРН -> owner.id и т.д.
+        self.owners: dict[str, int] = {}
+        self.addresses: dict[tuple[str | None, str | None], int] = {}
+
+        self.ids: dict[Table, list[int]] = defaultdict(list)
+        self.buffers: dict[Table, list[tuple]] = defaultdict(list)
+
+    async def load_indexes(self) -> None:
+        # Уже загруженные владельцы тоже участвуют в дедупликации,
+        # поэтому повторный запуск не плодит дубли
+        for business, column in (
+            (business_org, owner.c.business_org_id),
+            (business_man, owner.c.business_man_id),
+        ):
+            cursor = await self.connection.execute(
+                select(owner.c.id, business.c.inn, business.c.ogrn).join(
+                    business, column == business.c.id
+                )
+            )
+            for owner_id, inn, ogrn in cursor:
+                for key in (inn, ogrn):
+                    if key:
+                        self.owners[key] = owner_id
+
+        cursor = await self.connection.execute(
+            select(address.c.id, address.c.post_code, address.c.address)
+        )
+        for address_id, post_code, address_line in cursor:
+            self.addresses[(post_code, address_line)] = address_id
+
+    async def next_id(self, table: Table) -> int:
+        # id выдаются блоками, чтобы связи строились до COPY
+        if not self.ids[table]:
+            ids = await reserve_ids(table, self.batch_size, self.connection)
+            self.ids[table] = ids[::-1]
+
+        return self.ids[table].pop()
+
+    async def add(self, row: dict[str, Any]) -> None:
+        values: dict[Table, dict[str, Any]] = defaultdict(dict)
+        industry_id = None
+
+        for header, value in row.items():
+            key = (header or "").strip().lower()
+            if key == INDUSTRY_HEADER:
+                if value not in (None, ""):
+                    industry_id = await references_cache.find_id(
+                        industry.name, str(value)
+                    )
+                    if industry_id is None:
+                        raise RowError(f"Неизвестная отрасль {value!r}")
+                continue
+
+            if key in COLUMN_MAP:
+                table, column = COLUMN_MAP[key]
+            elif key.count(".") == 1 and key.split(".")[0] in TABLES:
+                table_name, column = key.split(".")
+                table = TABLES[table_name]
+                if column not in table.c or column == "id":
+                    continue
+            else:
+                continue
+
+            converted = _convert(table, column, value)
+            if converted is not None:
+                values[table][column] = converted
+
+        if not values[project].get("name"):
+            raise RowError("Не указано название проекта")
+
+        address_id = await self.add_address(values[address])
+        owner_id = await self.add_owner(values, address_id)
+
+        project_id = await self.next_id(project)
+        self.buffer(
+            project,
+            {
+                **values[project],
+                "id": project_id,
+                "owner_id": owner_id,
+                "address_id": address_id,
+                "industry_id": industry_id,
+            },
+        )
+
+        if values[support]:
+            support_id = await self.next_id(support)
+            self.buffer(
+                support,
+                {**values[support], "id": support_id, "project_id": project_id},
+            )
+
+            if values[decision]:
+                self.buffer(
+                    decision,
+                    {
+                        **values[decision],
+                        "id": await self.next_id(decision),
+                        "support_id": support_id,
+                    },
+                )
+
+    async def add_address(self, values: dict[str, Any]) -> int | None:
+        if not values:
+            return None
+
+        key = (values.get("post_code"), values.get("address"))
+        if key not in self.addresses:
+            self.addresses[key] = await self.next_id(address)
+            self.buffer(address, {**values, "id": self.addresses[key]})
+
+        return self.addresses[key]
+
+    async def add_owner(
+        self, values: dict[Table, dict[str, Any]], address_id: int | None
+    ) -> int | None:
+        org, man = values[business_org], values[business_man]
+        if not (org or man):
+            return None
+
+        # Юрлицо, если есть наименование, иначе ИП или физлицо. Общие
+        # колонки "ИНН" и "ОГРН" попадают в business_org, у ИП явные
+        # колонки business_man.* важнее них
+        is_org = bool(org.get("name") or org.get("name_short") or not man)
+        if not is_org:
+            man = {
+                **{k: org[k] for k in ("inn", "ogrn") if k in org},
+                **man,
+            }
+        business = org if is_org else man
+        inn, ogrn = business.get("inn"), business.get("ogrn")
+
+        for key in (inn, ogrn):
+            if key and key in self.owners:
+                self.progress.owners_reused += 1
+                return self.owners[key]
+
+        owner_id = await self.next_id(owner)
+        if is_org:
+            business_id = await self.next_id(business_org)
+            self.buffer(
+                business_org,
+                {**org, "id": business_id, "address_id": address_id},
+            )
+            self.buffer(
+                owner,
+                {"id": owner_id, "business_org_id": business_id},
+            )
+        else:
+            business_id = await self.next_id(business_man)
+            self.buffer(
+                business_man,
+                {**man, "id": business_id, "address_id": address_id},
+            )
+            self.buffer(
+                owner,
+                {"id": owner_id, "business_man_id": business_id},
+            )
+
+        if values[owner_contact]:
+            self.buffer(
+                owner_contact,
+                {
+                    **values[owner_contact],
+                    "id": await self.next_id(owner_contact),
+                    "owner_id": owner_id,
+                },
+            )
+
+        for key in (inn, ogrn):
+            if key:
+                self.owners[key] = owner_id
+
+        self.progress.owners_created += 1
+        return owner_id
+
+    def buffer(self, table: Table, values: dict[str, Any]) -> None:
+        self.buffers[table].append(
+            tuple(values.get(column) for column in COPY_COLUMNS[table])
+        )
+
+    async def flush(self) -> None:
+        for table, columns in COPY_COLUMNS.items():
+            if self.buffers[table]:
+                await copy_records(
+                    table, columns, self.buffers[table], self.connection
+                )
+                self.buffers[table] = []
+
+
+def _read_checkpoint(checkpoint: Path | None, source: Path) -> int:
+    if checkpoint is None or not checkpoint.exists():
+        return 0
+
+    data = json.loads(checkpoint.read_text())
+    return data["rows"] if data.get("source") == str(source) else 0
+
+
+def _write_checkpoint(checkpoint: Path, source: Path, rows: int) -> None:
+    checkpoint.write_text(json.dumps({"source": str(source), "rows": rows}))
+
+
+async def run_import(
+    source: Path,
+    batch_size: int = 5000,
+    checkpoint: Path | None = None,
+    progress: ImportProgress | None = None,
+) -> ImportProgress:
+    # Без checkpoint весь файл грузится одной транзакцией. С checkpoint
+    # транзакция фиксируется после каждой пачки, номер последней
+    # загруженной строки сохраняется в файл, и повторный запуск
+    # продолжает с нее
+    progress = progress or ImportProgress(source=str(source))
+    skip = _read_checkpoint(checkpoint, source)
+
+    rows = read_rows(source)
+    if skip:
+        await asyncio.to_thread(
+            lambda: sum(1 for _ in itertools.islice(rows, skip))
+        )
+        progress.rows_skipped = skip
+
+    try:
+        async with engine.connect() as connection:
+            importer = Importer(connection, progress, batch_size)
+            await importer.load_indexes()
+
+            while True:
+                # Чтение и разбор файла не блокируют цикл событий
+                chunk = await asyncio.to_thread(
+                    list, itertools.islice(rows, batch_size)
+                )
+                if not chunk:
+                    break
+
+                for row in chunk:
+                    progress.rows_read += 1
+                    row_number = skip + progress.rows_read + 1
+                    try:
+                        await importer.add(row)
+                    except RowError as e:
+                        progress.add_error(row_number, str(e))
+                    else:
+                        progress.rows_loaded += 1
+
+                await importer.flush()
+
+                if checkpoint is not None:
+                    await connection.commit()
+                    _write_checkpoint(
+                        checkpoint, source, skip + progress.rows_read
+                    )
+
+                logger.info(
+                    "Импорт %s: %d строк, %.0f строк/с",
+                    source,
+                    progress.rows_read,
+                    progress.rows_per_second,
+                )
+
+            await connection.commit()
+    except Exception as e:
+        progress.status = "failed"
+        progress.error = f"{type(e).__name__}: {e}"
+        raise
+    else:
+        progress.status = "done"
+    finally:
+        progress.finished_at = time.monotonic()
+
+    return progress
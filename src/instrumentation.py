@@ -0,0 +1,245 @@
+import time
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.database import QueryStats, query_stats
+from src.memory import memory
+from src.metrics.service import Histogram, Metric, registry
+from src.queries import reports
+
+# Верхние границы корзин гистограмм
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+MEMORY_BUCKETS = (
+    2**16,
+    2**18,
+    2**20,
+    2**22,
+    2**24,
+    2**26,
+    2**28,
+    2**30,
+)
+
+# Запросы, не попавшие ни в один маршрут (404, 405)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.memory_peak = Histogram(MEMORY_BUCKETS)
+
+    def observe(
+        self,
+        status_code: int,
+        seconds: float,
+        stats: QueryStats,
+        memory_peak: int | None,
+    ) -> None:
+        self.requests += 1
+        self.errors += status_code >= 500
+        self.rows += stats.rows
+        self.latency.observe(seconds)
+        self.db_seconds.observe(stats.seconds)
+        self.queries.observe(stats.queries)
+        if memory_peak is not None:
+            self.memory_peak.observe(memory_peak)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rows": self.rows,
+            "latency_seconds": self.latency.snapshot(),
+            "db_seconds": self.db_seconds.snapshot(),
+            "queries": self.queries.snapshot(),
+            "memory_peak_bytes": self.memory_peak.snapshot(),
+        }
+
+
+class Instrumentation:
+    # Статистика HTTP-запросов текущего воркера по шаблонам маршрутов:
+    # по /users/{id}, а не по каждому id
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.templates: dict[Any, str] | None = None
+
+    def route(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+
+        # Starlette не сохраняет маршрут в scope, только endpoint
+        if self.templates is None:
+            routes: list[BaseRoute] = scope["app"].routes
+            self.templates = {
+                route.endpoint: route.path
+                for route in routes
+                if hasattr(route, "endpoint")
+            }
+
+        return self.templates.get(endpoint, UNMATCHED_ROUTE)
+
+    def observe(
+        self,
+        scope: Scope,
+        status_code: int,
+        seconds: float,
+        stats: QueryStats,
+        memory_peak: int | None = None,
+    ) -> tuple[str, str]:
+        key = (scope["method"], self.route(scope))
+        route_stats = self.routes.get(key)
+        if route_stats is None:
+            route_stats = self.routes[key] = RouteStats()
+
+        route_stats.observe(status_code, seconds, stats, memory_peak)
+        return key
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {
+            f"{method} {route}": stats.snapshot()
+            for (method, route), stats in self.routes.items()
+        }
+
+    def metrics(self) -> list[Metric]:
+        requests = Metric(
+            "http_requests_total", "counter", "HTTP-запросы по маршрутам"
+        )
+        errors = Metric(
+            "http_request_errors_total", "counter", "Ответы 5xx по маршрутам"
+        )
+        rows = Metric(
+            "http_request_db_rows_total",
+            "counter",
+            "Строки, прочитанные и измененные в БД по маршрутам",
+        )
+        latency = Metric(
+            "http_request_duration_seconds",
+            "histogram",
+            "Время обработки (потоковых — до начала ответа), сек.",
+        )
+        db_seconds = Metric(
+            "http_request_db_seconds",
+            "histogram",
+            "Время запросов к БД на HTTP-запрос, сек.",
+        )
+        queries = Metric(
+            "http_request_db_queries",
+            "histogram",
+            "Запросов к БД на HTTP-запрос",
+        )
+        memory_peak = Metric(
+            "http_request_memory_peak_bytes",
+            "histogram",
+            "Прирост пика памяти Python за запрос (tracemalloc), байт",
+        )
+
+        for (method, route), stats in self.routes.items():
+            requests.add(stats.requests, method=method, route=route)
+            errors.add(stats.errors, method=method, route=route)
+            rows.add(stats.rows, method=method, route=route)
+            latency.add_histogram(stats.latency, method=method, route=route)
+            db_seconds.add_histogram(
+                stats.db_seconds, method=method, route=route
+            )
+            queries.add_histogram(stats.queries, method=method, route=route)
+            if stats.memory_peak.count:
+                memory_peak.add_histogram(
+                    stats.memory_peak, method=method, route=route
+                )
+
+        return [
+            requests,
+            errors,
+            rows,
+            latency,
+            db_seconds,
+            queries,
+            memory_peak,
+        ]
+
+
+instrumentation = Instrumentation()
+registry.register(instrumentation.metrics)
+
+
+def server_timing(seconds: float, stats: QueryStats) -> str:
+    return (
+        f"app;dur={seconds * 1000:.1f}, "
+        f"db;dur={stats.seconds * 1000:.1f};"
+        f'desc="{stats.queries} queries, {stats.rows} rows"'
+    )
+
+
+class InstrumentationMiddleware:
+    # Чистый ASGI: BaseHTTPMiddleware буферизует ответ и ломает
+    # потоковые выгрузки и SSE
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = QueryStats(debug=settings.DB_QUERY_DEBUG)
+        token = query_stats.set(stats)
+        memory_mark = memory.request_started()
+        status_code = 500
+        event_stream = False
+        # Время до начала ответа и признак тела из нескольких частей
+        response_started: float | None = None
+        streamed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, event_stream, response_started, streamed
+            if message["type"] == "http.response.start":
+                # Длительность до начала ответа: тело потоковых
+                # ответов в заголовок уже не попадет
+                status_code = message["status"]
+                response_started = time.perf_counter() - started
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", server_timing(response_started, stats)
+                )
+                if headers.get("content-type", "").startswith(
+                    "text/event-stream"
+                ):
+                    event_stream = True
+                    memory.request_streaming()
+            elif message["type"] == "http.response.body":
+                streamed = streamed or message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+            # Потоковые ответы (SSE, выгрузки) длятся, сколько клиент
+            # читает, в гистограмму задержек идет время до начала ответа
+            seconds = time.perf_counter() - started
+            if streamed and response_started is not None:
+                seconds = response_started
+            method, route = instrumentation.observe(
+                scope,
+                status_code,
+                seconds,
+                stats,
+                memory.request_finished(memory_mark, event_stream),
+            )
+
+        # Отчет по запросам строится после ответа, клиента он не задерживает
+        if stats.debug:
+            await reports.report(method, route, stats)
@@ -0,0 +1,147 @@
+# Отчет по индексам для таблиц из Base.metadata:
+#
+#   python -m src.internal.index_advisor [--min-rows 1000]
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.addresses.models import address  # noqa: F401
+from src.changes.models import change_log  # noqa: F401
+from src.database import engine
+from src.decisions.models import decision  # noqa: F401
+from src.models import Base
+from src.projects.models import project  # noqa: F401
+from src.supports.models import support  # noqa: F401
+from src.users.models import user  # noqa: F401
+
+TABLE_STATS = text(
+    """
+    SELECT relname, seq_scan, seq_tup_read, idx_scan, n_live_tup
+    FROM pg_stat_user_tables
+    WHERE relname = ANY(:tables)
+    ORDER BY seq_tup_read DESC
+    """
+)
+
+UNUSED_INDEXES = text(
+    """
+    SELECT s.relname, s.indexrelname, s.idx_scan,
+           pg_relation_size(s.indexrelid) AS size
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.relname = ANY(:tables)
+      AND s.idx_scan = 0
+      AND NOT i.indisprimary
+      AND NOT i.indisunique
+    ORDER BY size DESC
+    """
+)
+
+# Колонки, с которых начинается хотя бы один индекс
+LEADING_INDEX_COLUMNS = text(
+    """
+    SELECT t.relname, a.attname
+    FROM pg_index i
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = i.indkey[0]
+    WHERE t.relname = ANY(:tables)
+    """
+)
+
+TOP_STATEMENTS = text(
+    """
+    SELECT calls, mean_exec_time, total_exec_time, rows, query
+    FROM pg_stat_statements
+    WHERE query ~* :pattern
+    ORDER BY total_exec_time DESC
+    LIMIT :limit
+    """
+)
+
+
+async def report(
+    connection: AsyncConnection, min_rows: int, statements: int
+) -> list[str]:
+    tables = sorted(Base.metadata.tables)
+    lines = []
+
+    lines.append("Таблицы с преобладанием последовательного чтения:")
+    result = await connection.execute(TABLE_STATS, {"tables": tables})
+    for name, seq_scan, seq_tup_read, idx_scan, live in result:
+        if live >= min_rows and seq_scan > (idx_scan or 0):
+            per_scan = seq_tup_read // max(seq_scan, 1)
+            lines.append(
+                f"  {name}: seq_scan={seq_scan} idx_scan={idx_scan or 0} "
+                f"строк={live} читается за скан={per_scan}"
+            )
+
+    lines.append("Внешние ключи без индекса:")
+    result = await connection.execute(LEADING_INDEX_COLUMNS, {"tables": tables})
+    indexed = set(result.tuples())
+    for table in Base.metadata.sorted_tables:
+        for foreign_key in table.foreign_keys:
+            column = foreign_key.parent.name
+            if (table.name, column) not in indexed:
+                lines.append(f"  {table.name}.{column}")
+
+    lines.append("Неиспользуемые индексы:")
+    result = await connection.execute(UNUSED_INDEXES, {"tables": tables})
+    for name, index, _, size in result:
+        lines.append(f"  {name}.{index}: {size // 1024} КБ")
+
+    available = await connection.scalar(
+        text("SELECT to_regclass('pg_stat_statements') IS NOT NULL")
+    )
+    if not available:
+        lines.append("pg_stat_statements не установлен, запросы пропущены")
+        return lines
+
+    lines.append("Самые дорогие запросы к этим таблицам:")
+    pattern = r"\m(" + "|".join(tables) + r")\M"
+    result = await connection.execute(
+        TOP_STATEMENTS, {"pattern": pattern, "limit": statements}
+    )
+    for calls, mean, total, rows, query in result:
+        query = " ".join(query.split())[:120]
+        lines.append(
+            f"  {total:.0f} мс всего, {mean:.2f} мс в среднем, "
+            f"{calls} вызовов, {rows} строк: {query}"
+        )
+
+    return lines
+
+
+async def run(min_rows: int, statements: int) -> None:
+    async with engine.connect() as connection:
+        lines = await report(connection, min_rows, statements)
+    await engine.dispose()
+
+    print("\n".join(lines))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.internal.index_advisor",
+        description="Поиск таблиц без нужных индексов и лишних индексов",
+    )
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=1000,
+        help="Не показывать таблицы меньше этого размера",
+    )
+    parser.add_argument(
+        "--statements",
+        type=int,
+        default=10,
+        help="Сколько запросов из pg_stat_statements показать",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.min_rows, args.statements))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query, Response, status
+
+from src.admin import AdminOnly
+from src.database import pool_stats
+from src.etags import versions
+from src.instrumentation import instrumentation
+from src.internal.schemas import (
+    AllocationSite,
+    CacheTableStatus,
+    EventsStatus,
+    MemoryStatus,
+    PoolStatus,
+    QueryReport,
+    RouteStatus,
+    VersionTableStatus,
+)
+from src.memory import MAX_FRAMES, KeyType, memory
+from src.profiling import (
+    CONTENT_TYPE,
+    DEFAULT_INTERVAL,
+    MAX_INTERVAL,
+    MAX_SECONDS,
+    MIN_INTERVAL,
+    profile_filename,
+    profiler,
+)
+from src.projects.events import events
+from src.queries import reports
+from src.references.service import cache as references_cache
+
+# Статистика, тексты запросов и профили только для администратора
+router = APIRouter(
+    prefix="/internal", tags=["Служебное"], dependencies=[AdminOnly]
+)
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStatus,
+    status_code=status.HTTP_200_OK,
+    summary="Статистика пула соединений текущего воркера",
+)
+async def get_pool_status():
+    return pool_stats.snapshot()
+
+
+@router.get(
+    "/cache",
+    response_model=dict[str, CacheTableStatus],
+    status_code=status.HTTP_200_OK,
+    summary="Статистика кэша справочников текущего воркера",
+)
+async def get_cache_status():
+    return references_cache.stats()
+
+
+@router.get(
+    "/versions",
+    response_model=dict[str, VersionTableStatus],
+    status_code=status.HTTP_200_OK,
+    summary="Статистика кэша версий строк текущего воркера",
+)
+async def get_versions_status():
+    return versions.stats()
+
+
+@router.get(
+    "/events",
+    response_model=EventsStatus,
+    status_code=status.HTTP_200_OK,
+    summary="Статистика подписок на события текущего воркера",
+)
+async def get_events_status():
+    return events.stats()
+
+
+@router.get(
+    "/requests",
+    response_model=dict[str, RouteStatus],
+    status_code=status.HTTP_200_OK,
+    summary="Статистика запросов по маршрутам текущего воркера",
+)
+async def get_requests_status():
+    return instrumentation.snapshot()
+
+
+@router.get(
+    "/queries",
+    response_model=list[QueryReport],
+    status_code=status.HTTP_200_OK,
+    summary="Последние отчеты о N+1, медленных запросах и бюджетах",
+)
+async def get_query_reports():
+    # Отчеты копятся только при DB_QUERY_DEBUG
+    return list(reversed(reports.reports))
+
+
+@router.get(
+    "/profile",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_403_FORBIDDEN: {"model": None},
+        status.HTTP_409_CONFLICT: {"model": None},
+    },
+    summary="Профиль текущего воркера в формате collapsed stacks",
+)
+async def get_profile(
+    seconds: Annotated[float, Query(gt=0, le=MAX_SECONDS)] = 10,
+    interval: Annotated[
+        float, Query(ge=MIN_INTERVAL, le=MAX_INTERVAL)
+    ] = DEFAULT_INTERVAL,
+    tasks: Annotated[
+        bool, Query(description="Добавить стеки ожидающих задач asyncio")
+    ] = True,
+):
+    collapsed = await profiler.profile(seconds, interval, tasks)
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={profile_filename()}"
+    }
+    return Response(collapsed, media_type=CONTENT_TYPE, headers=headers)
+
+
+@router.get(
+    "/memory",
+    response_model=MemoryStatus,
+    status_code=status.HTTP_200_OK,
+    summary="Состояние tracemalloc текущего воркера",
+)
+async def get_memory_status():
+    return memory.status()
+
+
+@router.post(
+    "/memory/start",
+    response_model=MemoryStatus,
+    status_code=status.HTTP_200_OK,
+    summary="Запустить tracemalloc на текущем воркере",
+)
+async def start_memory_tracing(
+    frames: Annotated[
+        int, Query(ge=1, le=MAX_FRAMES, description="Глубина стеков")
+    ] = 1,
+    per_route: Annotated[
+        bool, Query(description="Собирать пик памяти по маршрутам")
+    ] = False,
+):
+    memory.start(frames, per_route)
+    return memory.status()
+
+
+@router.post(
+    "/memory/stop",
+    response_model=MemoryStatus,
+    status_code=status.HTTP_200_OK,
+    summary="Остановить tracemalloc на текущем воркере",
+)
+async def stop_memory_tracing():
+    memory.stop()
+    return memory.status()
+
+
+@router.post(
+    "/memory/snapshot",
+    response_model=MemoryStatus,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_409_CONFLICT: {"model": None},
+    },
+    summary="Снять снимок памяти для сравнения",
+)
+async def take_memory_snapshot():
+    await memory.set_baseline()
+    return memory.status()
+
+
+@router.get(
+    "/memory/top",
+    response_model=list[AllocationSite],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_409_CONFLICT: {"model": None},
+    },
+    summary="Основные места аллокаций памяти",
+)
+async def get_memory_top(
+    key: KeyType = "lineno",
+    limit: Annotated[int, Query(ge=1, le=1000)] = 20,
+    diff: Annotated[
+        bool, Query(description="Сравнить с последним снимком")
+    ] = False,
+):
+    return await memory.top(key, limit, diff)
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class PoolStatus(BaseModel):
+    size: int = Field(description="Постоянный размер пула")
+    checked_in: int = Field(description="Свободные соединения")
+    checked_out: int = Field(description="Выданные соединения")
+    overflow: int = Field(description="Соединения сверх размера пула")
+    max_overflow: int = Field(description="Допустимое превышение пула")
+    checkouts: int = Field(description="Всего выдач соединений")
+    checkins: int = Field(description="Всего возвратов соединений")
+    wait_seconds_sum: float = Field(
+        description="Суммарное время ожидания соединения, сек."
+    )
+    wait_seconds_buckets: dict[str, int] = Field(
+        description="Гистограмма ожидания соединения по верхним границам, сек."
+    )
+
+
+class CacheTableStatus(BaseModel):
+    rows: int = Field(description="Строк в кэше")
+    stale: bool = Field(description="Будет перечитана при следующем обращении")
+    hits: int = Field(description="Обращения без чтения из БД")
+    misses: int = Field(description="Обращения с перечитыванием таблицы")
+    loads: int = Field(description="Сколько раз таблица читалась из БД")
+
+
+class VersionTableStatus(BaseModel):
+    rows: int = Field(description="Строк с известной версией")
+    hits: int = Field(description="Условные запросы, версия найдена в памяти")
+    misses: int = Field(description="Условные запросы с чтением из БД")
+
+
+class EventsStatus(BaseModel):
+    subscribers: int = Field(description="Открытые подписки на события")
+    lagged: int = Field(description="Подписчики, не успевающие читать события")
+
+
+class HistogramStatus(BaseModel):
+    buckets: dict[str, int] = Field(
+        description="Наблюдения по верхним границам"
+    )
+    sum: float = Field(description="Сумма наблюдений")
+    count: int = Field(description="Число наблюдений")
+
+
+class RouteStatus(BaseModel):
+    requests: int = Field(description="Всего запросов")
+    errors: int = Field(description="Ответы 5xx")
+    rows: int = Field(description="Строк прочитано и изменено в БД")
+    latency_seconds: HistogramStatus = Field(
+        description="Время обработки (потоковых — до начала ответа), сек."
+    )
+    db_seconds: HistogramStatus = Field(description="Время запросов к БД, сек.")
+    queries: HistogramStatus = Field(description="Запросов к БД на запрос")
+    memory_peak_bytes: HistogramStatus = Field(
+        description="Прирост пика памяти за запрос, байт (tracemalloc)"
+    )
+
+
+class RepeatedQuery(BaseModel):
+    fingerprint: str = Field(description="Нормализованный текст запроса")
+    count: int = Field(description="Сколько раз выполнен за запрос")
+
+
+class SlowQuery(BaseModel):
+    statement: str = Field(description="Текст запроса")
+    seconds: float = Field(description="Длительность, сек.")
+    plan: str = Field(
+        description="EXPLAIN (ANALYZE, BUFFERS) для SELECT, EXPLAIN для записи"
+    )
+
+
+class QueryReport(BaseModel):
+    method: str
+    route: str
+    created_at: datetime
+    queries: int = Field(description="Запросов к БД")
+    budget: int | None = Field(description="Бюджет запросов маршрута")
+    seconds: float = Field(description="Время запросов к БД, сек.")
+    repeated: list[RepeatedQuery] = Field(description="Повторы, похожие на N+1")
+    slow: list[SlowQuery] = Field(description="Медленные запросы с планами")
+
+
+class MemoryStatus(BaseModel):
+    tracing: bool = Field(description="tracemalloc запущен")
+    frames: int = Field(description="Глубина сохраняемых стеков")
+    current_bytes: int = Field(description="Память под отслеживаемыми блоками")
+    peak_bytes: int = Field(description="Пик с момента запуска или сброса")
+    overhead_bytes: int = Field(description="Память самого tracemalloc")
+    baseline: bool = Field(description="Есть снимок для сравнения")
+    per_route: bool = Field(description="Пик памяти собирается по маршрутам")
+    per_route_measured: int = Field(description="Запросов с измеренным пиком")
+    per_route_skipped: int = Field(
+        description="Запросов без пика: шли одновременно с другими"
+    )
+    in_flight: int = Field(description="Обрабатываемых запросов")
+    streams: int = Field(description="Открытых потоков событий (SSE)")
+
+
+class AllocationSite(BaseModel):
+    site: str = Field(description="Место аллокации или стек через ';'")
+    size_bytes: int = Field(description="Занято байт")
+    count: int = Field(description="Блоков памяти")
+    size_diff_bytes: int | None = Field(description="Изменение со снимка")
+    count_diff: int | None = Field(description="Изменение числа блоков")
@@ -0,0 +1,163 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Annotated, Any, TypeAlias
+
+from fastapi import Depends
+from sqlalchemy import Column, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.database import DbConnection, fetch_all
+from src.references.service import cache
+
+
+class Loader:
+    # Ключи, запрошенные за одну итерацию event loop, загружаются одним
+    # запросом WHERE column = ANY($1), результаты кэшируются до конца
+    # HTTP-запроса
+    def __init__(
+        self,
+        column: Column,
+        connection: AsyncConnection,
+        many: bool,
+        order_by: tuple[Column, ...] = (),
+    ):
+        self.column = column
+        self.connection = connection
+        self.many = many
+        self.order_by = order_by
+        self.futures: dict[Any, asyncio.Future] = {}
+        self.queue: list[Any] = []
+        self.task: asyncio.Task | None = None
+
+    def load(self, key: Any) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+
+        if key in self.futures:
+            return self.futures[key]
+
+        future = self.futures[key] = loop.create_future()
+        if key is None:
+            future.set_result([] if self.many else None)
+            return future
+
+        # Задача стартует, когда текущая корутина уступит управление,
+        # к этому моменту в очереди соберутся все ключи
+        if not self.queue:
+            self.task = loop.create_task(self.dispatch())
+        self.queue.append(key)
+
+        return future
+
+    async def load_many(self, keys: list[Any]) -> list[Any]:
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    async def dispatch(self) -> None:
+        keys, self.queue = self.queue, []
+
+        keys_param = bindparam("keys", keys, type_=ARRAY(self.column.type))
+        select_query = (
+            select(self.column.table)
+            .where(self.column == any_(keys_param))
+            .order_by(*self.order_by)
+        )
+
+        try:
+            rows = await fetch_all(select_query, self.connection)
+        except Exception as error:
+            for key in keys:
+                self.futures.pop(key).set_exception(error)
+            return
+
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row[self.column.name]].append(row)
+
+        for key in keys:
+            found = grouped.get(key, [])
+            if self.many:
+                self.futures[key].set_result(found)
+            else:
+                self.futures[key].set_result(found[0] if found else None)
+
+
+class ReferenceLoader:
+    # Справочники уже лежат в памяти процесса, запрос в БД не нужен
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+
+    async def load_many(self, keys: list[Any]) -> list[Any]:
+        return [
+            await cache.get(self.table_name, key) if key is not None else None
+            for key in keys
+        ]
+
+
+class Loaders:
+    def __init__(self, connection: AsyncConnection):
+        self.connection = connection
+        self.loaders: dict[tuple[Column, bool], Loader] = {}
+
+    def get(
+        self, column: Column, many: bool, *order_by: Column
+    ) -> Loader | ReferenceLoader:
+        table_name = column.table.name
+        if not many and column.primary_key and table_name in cache.tables:
+            return ReferenceLoader(table_name)
+
+        if (column, many) not in self.loaders:
+            self.loaders[column, many] = Loader(
+                column, self.connection, many, order_by
+            )
+
+        return self.loaders[column, many]
+
+    def one(self, column: Column) -> Loader | ReferenceLoader:
+        return self.get(column, False)
+
+    def many(self, column: Column, *order_by: Column) -> Loader:
+        return self.get(column, True, *order_by)
+
+
+def get_loaders(connection: DbConnection) -> Loaders:
+    return Loaders(connection)
+
+
+RequestLoaders: TypeAlias = Annotated[Loaders, Depends(get_loaders)]
+
+
+@dataclass(frozen=True)
+class Relation:
+    # key: поле строки-родителя, column: колонка, по которой ищутся
+    # связанные строки
+    key: str
+    column: Column
+    many: bool = False
+    order_by: tuple[Column, ...] = ()
+
+
+async def attach(
+    rows: list[dict[str, Any]],
+    key: str,
+    name: str,
+    loader: Loader | ReferenceLoader,
+) -> None:
+    values = await loader.load_many([row[key] for row in rows])
+
+    for row, value in zip(rows, values):
+        row[name] = value
+
+
+async def load_relations(
+    rows: list[dict[str, Any]],
+    relations: dict[str, Relation],
+    include: set[str],
+    loaders: Loaders,
+) -> None:
+    for name, relation in relations.items():
+        if name in include:
+            loader = loaders.get(
+                relation.column, relation.many, *relation.order_by
+            )
+            await attach(rows, relation.key, name, loader)
@@ -1,13 +1,74 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
 from src.addresses.router import router as addresses_router
+from src.changes.router import router as changes_router
 from src.config import app_configs
+from src.database import QueryBudgetExceeded, engine
 from src.decisions.router import router as decisions_router
+from src.imports.router import router as imports_router
+from src.instrumentation import InstrumentationMiddleware, instrumentation
+from src.internal.router import router as internal_router
+from src.metrics.router import router as metrics_router
+from src.metrics.service import registry as metrics_registry
+from src.notifications import notifications
+from src.profiling import ProfileMiddleware
 from src.projects.router import router as projects_router
+from src.references.service import ReferenceNotFound
+from src.references.service import cache as references_cache
+from src.references.service import reference_error
 from src.supports.router import router as supports_router
 from src.users.router import router as users_router
 
-app = FastAPI(**app_configs)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await metrics_registry.start()
+    await notifications.start()
+    await references_cache.start()
+    try:
+        yield
+    finally:
+        references_cache.stop()
+        await notifications.stop()
+        await metrics_registry.stop()
+        await engine.dispose()
+
+
+app = FastAPI(**app_configs, lifespan=lifespan)
+app.add_middleware(InstrumentationMiddleware)
+app.add_middleware(ProfileMiddleware)
+
+
+@app.exception_handler(QueryBudgetExceeded)
+async def query_budget_exceeded_handler(
+    request: Request, exc: QueryBudgetExceeded
+):
+    # Только при DB_QUERY_BUDGET_STRICT: маршрут делает больше запросов
+    # к БД, чем ему положено, скорее всего N+1
+    route = instrumentation.route(request.scope)
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "detail": (
+                f"{request.method} {route}: превышен бюджет запросов к БД, "
+                f"запрос {exc.queries} при бюджете {exc.budget}"
+            ),
+            "route": route,
+            "budget": exc.budget,
+            "queries": exc.queries,
+        },
+    )
+
+
+@app.exception_handler(ReferenceNotFound)
+async def reference_not_found_handler(request: Request, exc: ReferenceNotFound):
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": [reference_error(field) for field in exc.fields]},
+    )
 
 
 app.include_router(users_router)
@@ -15,3 +76,7 @@ app.include_router(addresses_router)
 app.include_router(decisions_router)
 app.include_router(supports_router)
 app.include_router(projects_router)
+app.include_router(imports_router)
+app.include_router(changes_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
@@ -0,0 +1,164 @@
+import asyncio
+import tracemalloc
+from typing import Any, Literal
+
+from fastapi import HTTPException, status
+
+from src.profiling import short_path
+
+MAX_FRAMES = 50
+
+KeyType = Literal["lineno", "filename", "traceback"]
+
+# Аллокации самого tracemalloc и импорта модулей в отчете не нужны
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _site(traceback: tracemalloc.Traceback, key_type: KeyType) -> str:
+    if key_type == "filename":
+        return short_path(traceback[0].filename)
+
+    # Кадры от внешнего к месту аллокации
+    return ";".join(
+        f"{short_path(frame.filename)}:{frame.lineno}" for frame in traceback
+    )
+
+
+class MemoryTracker:
+    # tracemalloc по запросу: включается и выключается через эндпоинты,
+    # без него накладных расходов нет.
+    # Пик памяти запроса снимается только у запросов, во время
+    # которых воркер не обрабатывал другие: пик процесса общий.
+    # Открытые потоки событий (SSE) живут часами, поэтому после начала
+    # ответа они в число обрабатываемых запросов не входят
+    def __init__(self) -> None:
+        self.baseline: tracemalloc.Snapshot | None = None
+        self.per_route = False
+        self.in_flight = 0
+        self.streams = 0
+        self.started = 0
+        self.measured = 0
+        self.skipped = 0
+
+    def check_tracing(self) -> None:
+        if not tracemalloc.is_tracing():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="tracemalloc не запущен",
+            )
+
+    def start(self, frames: int, per_route: bool) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+        self.baseline = None
+        self.per_route = per_route
+        self.measured = self.skipped = 0
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.baseline = None
+        self.per_route = False
+
+    def status(self) -> dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "baseline": self.baseline is not None,
+            "per_route": self.per_route,
+            "per_route_measured": self.measured,
+            "per_route_skipped": self.skipped,
+            "in_flight": self.in_flight,
+            "streams": self.streams,
+        }
+
+    async def take_snapshot(self) -> tracemalloc.Snapshot:
+        self.check_tracing()
+        snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+        return snapshot.filter_traces(_FILTERS)
+
+    async def set_baseline(self) -> None:
+        self.baseline = await self.take_snapshot()
+
+    async def top(
+        self, key_type: KeyType, limit: int, diff: bool
+    ) -> list[dict[str, Any]]:
+        if diff and self.baseline is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Нет снимка для сравнения",
+            )
+
+        snapshot = await self.take_snapshot()
+        if diff:
+            stats = await asyncio.to_thread(
+                snapshot.compare_to, self.baseline, key_type
+            )
+        else:
+            stats = await asyncio.to_thread(snapshot.statistics, key_type)
+
+        return [
+            {
+                "site": _site(stat.traceback, key_type),
+                "size_bytes": stat.size,
+                "count": stat.count,
+                "size_diff_bytes": getattr(stat, "size_diff", None),
+                "count_diff": getattr(stat, "count_diff", None),
+            }
+            for stat in stats[:limit]
+        ]
+
+    def request_started(self) -> tuple[int, int] | None:
+        # Возвращает метку начала запроса, если его пик можно измерить
+        self.in_flight += 1
+        self.started += 1
+        if not self.per_route or not tracemalloc.is_tracing():
+            return None
+        if self.in_flight > 1:
+            self.skipped += 1
+            return None
+
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        return self.started, current
+
+    def request_streaming(self) -> None:
+        # Запрос стал потоком событий: другие запросы рядом с ним
+        # снова измеримы
+        self.in_flight -= 1
+        self.streams += 1
+
+    def request_finished(
+        self, mark: tuple[int, int] | None, streaming: bool = False
+    ) -> int | None:
+        # Прирост пика памяти за запрос, байт
+        if streaming:
+            self.streams -= 1
+            return None
+
+        self.in_flight -= 1
+        if mark is None or not tracemalloc.is_tracing():
+            return None
+
+        started, current = mark
+        # За время запроса начались другие: пик уже не только его
+        if started != self.started:
+            self.skipped += 1
+            return None
+
+        self.measured += 1
+        _, peak = tracemalloc.get_traced_memory()
+        return max(peak - current, 0)
+
+
+memory = MemoryTracker()
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+
+from src.admin import ScraperOnly
+from src.metrics.service import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["Служебное"], dependencies=[ScraperOnly])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Метрики всех воркеров в формате Prometheus",
+)
+async def get_metrics():
+    return PlainTextResponse(await registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,256 @@
+import asyncio
+import bisect
+import gc
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Формат текстовой выдачи Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Как часто измеряется задержка цикла событий и сбрасываются метрики
+# воркера в METRICS_DIR, сек.
+LAG_INTERVAL = 0.5
+DUMP_INTERVAL = 5.0
+# Файлы воркеров, не обновлявшиеся дольше, считаются файлами умерших
+STALE_AFTER = 60.0
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+GC_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+MetricType = Literal["counter", "gauge", "histogram"]
+# Сведение gauge по воркерам: сумма, максимум или каждый воркер
+# отдельно с меткой pid. Счетчики и гистограммы всегда складываются
+GaugeMode = Literal["sum", "max", "all"]
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        buckets = [*map(str, self.buckets), "+Inf"]
+        return {
+            "buckets": dict(zip(buckets, self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+@dataclass
+class Metric:
+    name: str
+    type: MetricType
+    help: str
+    mode: GaugeMode = "sum"
+    samples: list[tuple[str, dict[str, str], float]] = field(
+        default_factory=list
+    )
+
+    def add(self, value: float, **labels: str) -> None:
+        self.samples.append((self.name, labels, value))
+
+    def add_histogram(self, histogram: Histogram, **labels: str) -> None:
+        # В Prometheus корзины накопительные
+        bounds = [*map(str, histogram.buckets), "+Inf"]
+        total = 0
+        for bound, count in zip(bounds, histogram.counts):
+            total += count
+            self.samples.append(
+                (f"{self.name}_bucket", {**labels, "le": bound}, total)
+            )
+        self.samples.append((f"{self.name}_sum", labels, histogram.sum))
+        self.samples.append((f"{self.name}_count", labels, histogram.count))
+
+
+Collector = Callable[[], list[Metric]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _format_sample(name: str, labels: dict[str, str], value: float) -> str:
+    if labels:
+        pairs = ",".join(
+            '{}="{}"'.format(key, _escape(label).replace('"', r"\""))
+            for key, label in labels.items()
+        )
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {value}"
+
+
+def exposition(metrics: list[Metric]) -> str:
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples:
+            lines.append(_format_sample(name, labels, value))
+    return "\n".join(lines) + "\n"
+
+
+def merge(workers: dict[int, list[Metric]]) -> list[Metric]:
+    merged: dict[str, Metric] = {}
+    values: dict[str, dict[tuple, float]] = {}
+
+    for pid, metrics in workers.items():
+        for metric in metrics:
+            if metric.name not in merged:
+                merged[metric.name] = Metric(
+                    metric.name, metric.type, metric.help, metric.mode
+                )
+            samples = values.setdefault(metric.name, {})
+            per_worker = metric.type == "gauge" and metric.mode == "all"
+            for name, labels, value in metric.samples:
+                if per_worker:
+                    labels = {**labels, "pid": str(pid)}
+                key = (name, tuple(labels.items()))
+                if key not in samples:
+                    samples[key] = value
+                elif metric.type == "gauge" and metric.mode == "max":
+                    samples[key] = max(samples[key], value)
+                else:
+                    samples[key] += value
+
+    for name, metric in merged.items():
+        metric.samples = [
+            (sample, dict(labels), value)
+            for (sample, labels), value in values[name].items()
+        ]
+    return list(merged.values())
+
+
+class Registry:
+    # Метрики воркера собираются с его объектов в момент запроса:
+    # на горячем пути только инкременты полей, без блокировок.
+    # Коллекторы регистрируются при импорте модулей.
+    # При нескольких воркерах каждый периодически сбрасывает свои
+    # метрики в файл METRICS_DIR, /metrics сводит файлы всех воркеров
+    def __init__(self) -> None:
+        self.collectors: list[Collector] = []
+        self.lag = Histogram(LAG_BUCKETS)
+        self.gc_pauses = {
+            generation: Histogram(GC_BUCKETS) for generation in range(3)
+        }
+        self.gc_started: float | None = None
+        self.task: asyncio.Task | None = None
+        self.register(self.runtime_metrics)
+
+    def register(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def collect(self) -> list[Metric]:
+        return [metric for collect in self.collectors for metric in collect()]
+
+    async def start(self) -> None:
+        if settings.METRICS_DIR:
+            Path(settings.METRICS_DIR).mkdir(parents=True, exist_ok=True)
+        gc.callbacks.append(self.on_gc)
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        gc.callbacks.remove(self.on_gc)
+        if self.task is not None:
+            self.task.cancel()
+        if settings.METRICS_DIR:
+            self.path.unlink(missing_ok=True)
+
+    def on_gc(self, phase: str, info: dict[str, int]) -> None:
+        if phase == "start":
+            self.gc_started = time.perf_counter()
+        elif self.gc_started is not None:
+            self.gc_pauses[info["generation"]].observe(
+                time.perf_counter() - self.gc_started
+            )
+            self.gc_started = None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        dumped = loop.time()
+        while True:
+            # Насколько позже срока проснулся sleep: столько цикл
+            # событий был занят синхронным кодом
+            started = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            now = loop.time()
+            self.lag.observe(max(now - started - LAG_INTERVAL, 0.0))
+
+            if settings.METRICS_DIR and now - dumped >= DUMP_INTERVAL:
+                dumped = now
+                try:
+                    await self.dump()
+                except OSError:
+                    logger.exception("Не удалось сохранить метрики воркера")
+
+    def runtime_metrics(self) -> list[Metric]:
+        lag = Metric(
+            "event_loop_lag_seconds",
+            "histogram",
+            "Задержка цикла событий воркера, сек.",
+        )
+        lag.add_histogram(self.lag)
+
+        gc_pauses = Metric(
+            "gc_pause_seconds", "histogram", "Паузы сборщика мусора, сек."
+        )
+        for generation, histogram in self.gc_pauses.items():
+            gc_pauses.add_histogram(histogram, generation=str(generation))
+
+        return [lag, gc_pauses]
+
+    @property
+    def path(self) -> Path:
+        return Path(settings.METRICS_DIR) / f"metrics_{os.getpid()}.json"
+
+    async def dump(self) -> None:
+        data = json.dumps([asdict(metric) for metric in self.collect()])
+        await asyncio.to_thread(_write_atomic, self.path, data)
+
+    def load_workers(self) -> dict[int, list[Metric]]:
+        workers = {}
+        now = time.time()
+        for path in Path(settings.METRICS_DIR).glob("metrics_*.json"):
+            pid = int(path.stem.removeprefix("metrics_"))
+            if pid == os.getpid():
+                continue
+            try:
+                if now - path.stat().st_mtime > STALE_AFTER:
+                    continue
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            workers[pid] = [Metric(**metric) for metric in data]
+        return workers
+
+    async def render(self) -> str:
+        workers = {os.getpid(): self.collect()}
+        if settings.METRICS_DIR:
+            workers |= await asyncio.to_thread(self.load_workers)
+        return exposition(merge(workers))
+
+
+def _write_atomic(path: Path, data: str) -> None:
+    # Читатель видит либо старый файл, либо новый целиком
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(data)
+    os.replace(tmp_path, path)
+
+
+registry = Registry()
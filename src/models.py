@@ -1,6 +1,8 @@
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
+    DateTime,
     Enum,
     ForeignKeyConstraint,
     Integer,
@@ -8,6 +10,8 @@ from sqlalchemy import (
     PrimaryKeyConstraint,
     Table,
     Text,
+    func,
+    text,
 )
 from sqlalchemy.orm import declarative_base
 
@@ -18,6 +22,26 @@ Base = declarative_base()
 Base.metadata = MetaData(naming_convention=DB_NAMING_CONVENTION)
 
 
+def row_version_columns() -> list[Column]:
+    # Заполняются триггером row_version_bump при каждом изменении строки
+    return [
+        Column(
+            "version",
+            BigInteger,
+            nullable=False,
+            server_default=text("1"),
+            comment="Версия строки",
+        ),
+        Column(
+            "updated_at",
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.now(),
+            comment="Время последнего изменения",
+        ),
+    ]
+
+
 city = Table(
     "city",
     Base.metadata,
@@ -77,8 +101,8 @@ business_man = Table(
     Column("last_name", Text, comment="Фамилия"),
     Column("first_name", Text, comment="Имя"),
     Column("middle_name", Text, comment="Отчество"),
-    Column("inn", Text, comment="ИНН"),
-    Column("ogrn", Text, comment="ОГРН"),
+    Column("inn", Text, index=True, comment="ИНН"),
+    Column("ogrn", Text, index=True, comment="ОГРН"),
     ForeignKeyConstraint(
         ["address_id"], ["address.id"], name="business_man_address_id_fkey"
     ),
@@ -93,8 +117,8 @@ business_org = Table(
     Column("address_id", Integer),
     Column("name", Text, comment="Полное наименование"),
     Column("name_short", Text, comment="Сокращенное наименование"),
-    Column("inn", Text, comment="ИНН"),
-    Column("ogrn", Text, comment="ОГРН"),
+    Column("inn", Text, index=True, comment="ИНН"),
+    Column("ogrn", Text, index=True, comment="ОГРН"),
     ForeignKeyConstraint(
         ["address_id"], ["address.id"], name="business_org_address_id_fkey"
     ),
@@ -126,7 +150,7 @@ owner_contact = Table(
     "owner_contact",
     Base.metadata,
     Column("id", Integer),
-    Column("owner_id", Integer),
+    Column("owner_id", Integer, index=True),
     Column("phone_no", Text, comment="Номер телефона"),
     Column("email", Text, comment="Адрес электронной почты"),
     ForeignKeyConstraint(
@@ -141,8 +165,8 @@ user_project = Table(
     "user_project",
     Base.metadata,
     Column("id", Integer),
-    Column("user_id", Integer),
-    Column("project_id", Integer),
+    Column("user_id", Integer, index=True),
+    Column("project_id", Integer, index=True),
     ForeignKeyConstraint(
         ["project_id"], ["project.id"], name="user_project_project_id_fkey"
     ),
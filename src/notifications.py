@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable
+
+import asyncpg
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_MAX = 30.0
+
+# Проверка соединения LISTEN: молча оборванное TCP-соединение
+# не вызывает on_terminate, уведомления просто перестают приходить
+KEEPALIVE_INTERVAL = 10.0
+KEEPALIVE_TIMEOUT = 5.0
+
+# Обработчик получает payload уведомления или None, если уведомления
+# могли быть пропущены (старт, обрыв соединения)
+Handler = Callable[[str | None], None]
+
+
+class Notifications:
+    # Одно соединение LISTEN на воркер для всех каналов.
+    # Подписки регистрируются при импорте модулей, до start()
+    def __init__(self) -> None:
+        self.handlers: dict[str, list[Handler]] = defaultdict(list)
+        self.listener: asyncpg.Connection | None = None
+        self.reconnect_task: asyncio.Task | None = None
+        self.keepalive_task: asyncio.Task | None = None
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self.handlers[channel].append(handler)
+
+    async def start(self) -> None:
+        await self.listen()
+        self.keepalive_task = asyncio.create_task(self.keepalive())
+
+    async def stop(self) -> None:
+        for task in (self.keepalive_task, self.reconnect_task):
+            if task is not None:
+                task.cancel()
+        if self.listener is not None:
+            listener, self.listener = self.listener, None
+            await listener.close()
+
+    async def listen(self) -> None:
+        dsn = settings.DATABASE_URL.unicode_string().replace(
+            f"{settings.DATABASE_URL.scheme}://", "postgresql://", 1
+        )
+        # Соединение становится слушателем, только когда все каналы
+        # подписаны: иначе reconnect() решит, что переподключаться не нужно
+        listener = await asyncpg.connect(dsn)
+        try:
+            for channel in self.handlers:
+                await listener.add_listener(channel, self.on_notify)
+        except BaseException:
+            await listener.close()
+            raise
+        listener.add_termination_listener(self.on_terminate)
+        self.listener = listener
+        # Изменения, пропущенные пока слушателя не было
+        self.reset()
+
+    def call(self, handler: Handler, payload: str | None) -> None:
+        # Ошибка одного обработчика не мешает остальным
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("Ошибка обработчика уведомления")
+
+    def on_notify(self, connection, pid, channel: str, payload: str) -> None:
+        for handler in self.handlers[channel]:
+            self.call(handler, payload)
+
+    def reset(self) -> None:
+        for handlers in self.handlers.values():
+            for handler in handlers:
+                self.call(handler, None)
+
+    def on_terminate(self, connection) -> None:
+        if self.listener is None or connection is not self.listener:
+            return
+
+        logger.warning("Соединение LISTEN потеряно")
+        self.listener = None
+        self.reset()
+        self.reconnect_task = asyncio.create_task(self.reconnect())
+
+    async def keepalive(self) -> None:
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            listener = self.listener
+            if listener is None:
+                continue
+            try:
+                await listener.fetchval("SELECT 1", timeout=KEEPALIVE_TIMEOUT)
+            except Exception:
+                # terminate() вызовет on_terminate, дальше переподключение
+                logger.warning("Соединение LISTEN не отвечает", exc_info=True)
+                listener.terminate()
+
+    async def reconnect(self) -> None:
+        delay = 1.0
+        while self.listener is None:
+            await asyncio.sleep(delay)
+            try:
+                await self.listen()
+            except Exception:
+                # Любая ошибка (сеть, авторизация, SSL, протокол): без
+                # слушателя кэши больше не сбросятся, поэтому повторяем
+                logger.warning(
+                    "Не удалось переподключить LISTEN", exc_info=True
+                )
+                delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+
+notifications = Notifications()
@@ -0,0 +1,143 @@
+import base64
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Annotated, Any, TypeAlias
+
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Column, Select, Table, and_, or_, tuple_
+
+MAX_LIMIT = 500
+
+
+class PaginationParams:
+    def __init__(
+        self,
+        limit: Annotated[
+            int, Query(ge=1, le=MAX_LIMIT, description="Размер страницы")
+        ] = 50,
+        after: Annotated[
+            str | None,
+            Query(description="Курсор следующей страницы из заголовка Link"),
+        ] = None,
+        count: Annotated[
+            bool,
+            Query(
+                description="Вернуть оценку общего числа строк в X-Total-Count"
+            ),
+        ] = False,
+    ):
+        self.limit = limit
+        self.after = after
+        self.count = count
+
+
+Pagination: TypeAlias = Annotated[PaginationParams, Depends()]
+
+
+def encode_cursor(sort: str, row: dict[str, Any]) -> str:
+    key = sort.lstrip("-")
+    payload = json.dumps([sort, row[key], row["id"]], default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _coerce(column: Column, value: Any) -> Any:
+    if value is None:
+        if not column.nullable:
+            raise ValueError(value)
+        return None
+
+    python_type = column.type.python_type
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def decode_cursor(cursor: str, sort: str, column: Column) -> tuple[Any, int]:
+    # Курсор приходит от клиента: любая ошибка разбора — 400, а не 500
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor))
+        if not isinstance(payload, list) or len(payload) != 3:
+            raise ValueError(payload)
+
+        cursor_sort, value, id = payload
+        if cursor_sort != sort:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Курсор получен для другой сортировки",
+            )
+        if type(id) is not int:
+            raise ValueError(id)
+
+        return _coerce(column, value), id
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор",
+        )
+
+
+def paginate(
+    query: Select, table: Table, sort: str, pagination: PaginationParams
+) -> Select:
+    # Keyset-пагинация по (sort, id): без OFFSET, страница читается
+    # по индексу с места, где закончилась предыдущая.
+    # NULL в ключе сортировки всегда идут в конце
+    descending = sort.startswith("-")
+    column = table.c[sort.lstrip("-")]
+    id_column = table.c.id
+
+    if column is id_column:
+        order_by = [id_column.desc() if descending else id_column.asc()]
+    elif descending:
+        order_by = [column.desc().nulls_last(), id_column.desc()]
+    else:
+        order_by = [column.asc().nulls_last(), id_column.asc()]
+
+    if pagination.after is not None:
+        value, last_id = decode_cursor(pagination.after, sort, column)
+
+        if column is id_column:
+            condition = id_column < value if descending else id_column > value
+        elif value is None:
+            condition = and_(
+                column.is_(None),
+                id_column < last_id if descending else id_column > last_id,
+            )
+        else:
+            key = tuple_(column, id_column)
+            if descending:
+                condition = or_(key < (value, last_id), column.is_(None))
+            else:
+                condition = or_(key > (value, last_id), column.is_(None))
+
+        query = query.where(condition)
+
+    # Лишняя строка показывает, есть ли следующая страница
+    return query.order_by(*order_by).limit(pagination.limit + 1)
+
+
+def split_page(
+    rows: list[dict[str, Any]], sort: str, pagination: PaginationParams
+) -> tuple[list[dict[str, Any]], str | None]:
+    if len(rows) <= pagination.limit:
+        return rows, None
+
+    rows = rows[: pagination.limit]
+    return rows, encode_cursor(sort, rows[-1])
+
+
+def set_page_headers(
+    request: Request,
+    response: Response,
+    next_cursor: str | None,
+    total: int | None,
+) -> None:
+    if next_cursor is not None:
+        next_url = request.url.include_query_params(after=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
@@ -0,0 +1,242 @@
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.admin import is_admin_token
+
+PROFILE_HEADER = "x-profile"
+CONTENT_TYPE = "text/plain; charset=utf-8"
+
+DEFAULT_INTERVAL = 0.01
+MIN_INTERVAL = 0.001
+MAX_INTERVAL = 0.1
+MAX_SECONDS = 60
+
+# Пути в стеках короче: относительно проекта, stdlib и site-packages
+_PATH_PREFIXES = sorted(
+    {
+        str(Path(__file__).resolve().parent.parent) + os.sep,
+        *(os.path.join(path, "") for path in sys.path if path),
+    },
+    key=len,
+    reverse=True,
+)
+
+
+def short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix) :]
+    return filename
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = short_path(code.co_filename)
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame: FrameType | None) -> list[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_name(frame))
+        frame = frame.f_back
+    return stack[::-1]
+
+
+def _await_stack(coro: Any) -> list[str]:
+    # Цепочка await приостановленной корутины, от внешней к внутренней
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(
+            coro, "gi_frame", None
+        )
+        if frame is None:
+            break
+        stack.append(_frame_name(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(
+            coro, "gi_yieldfrom", None
+        )
+    return stack
+
+
+class Sampler:
+    # Статистический профилировщик: отдельный поток с заданным интервалом
+    # снимает стек потока цикла событий, при tasks=True еще и цепочки
+    # await приостановленных задач (время ожидания БД, сети).
+    # С task снимается только одна задача: ее стек, когда она
+    # выполняется, и ее цепочка await, когда она ждет
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        tasks: bool = False,
+        task: asyncio.Task | None = None,
+    ) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+        self.interval = interval
+        self.tasks = tasks
+        self.task = task
+        self.ignored: set[asyncio.Task] = set()
+        self.stacks: Counter[str] = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name="sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> str:
+        self.stopped.set()
+        self.thread.join()
+        return self.collapsed()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def add(self, stack: list[str]) -> None:
+        if stack:
+            self.stacks[";".join(stack)] += 1
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        current = asyncio.current_task(self.loop)
+
+        if self.task is not None:
+            if self.task.done():
+                return
+            if current is self.task:
+                self.add(_thread_stack(frame))
+            else:
+                self.add(["[await]", *_await_stack(self.task.get_coro())])
+            return
+
+        self.add(_thread_stack(frame))
+        if not self.tasks:
+            return
+
+        for task in asyncio.all_tasks(self.loop):
+            if task is current or task in self.ignored:
+                continue
+            self.add(
+                [
+                    f"[task {task.get_name()}]",
+                    *_await_stack(task.get_coro()),
+                ]
+            )
+
+    def collapsed(self) -> str:
+        # Формат collapsed stacks: flamegraph.pl, speedscope, inferno
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+class Profiler:
+    # Один профилировщик на воркер: два потока выборки искажали бы
+    # друг другу результаты
+    def __init__(self) -> None:
+        self.sampler: Sampler | None = None
+
+    def begin(self, sampler: Sampler) -> None:
+        if self.sampler is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Профилирование уже идет",
+            )
+        self.sampler = sampler
+        sampler.start()
+
+    def end(self) -> str:
+        sampler, self.sampler = self.sampler, None
+        return sampler.stop()
+
+    async def profile(
+        self, seconds: float, interval: float, tasks: bool
+    ) -> str:
+        sampler = Sampler(interval, tasks)
+        # Задача самого эндпоинта все время спит, в профиле она не нужна
+        sampler.ignored.add(asyncio.current_task())
+        self.begin(sampler)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            collapsed = self.end()
+        return collapsed
+
+
+profiler = Profiler()
+
+
+def profile_filename() -> str:
+    return f"profile-{os.getpid()}.collapsed"
+
+
+class ProfileMiddleware:
+    # Запрос с заголовком X-Profile: <ADMIN_TOKEN> выполняется под
+    # профилировщиком, вместо ответа возвращаются стеки. Потоковые
+    # ответы профилируются до конца потока
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not is_admin_token(
+            Headers(scope=scope).get(PROFILE_HEADER)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        try:
+            profiler.begin(Sampler(task=asyncio.current_task()))
+        except HTTPException as e:
+            await _send_text(send, e.status_code, e.detail.encode(), [])
+            return
+
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            collapsed = profiler.end()
+
+        headers = [
+            (b"x-profiled-status", str(status_code).encode()),
+            (
+                b"content-disposition",
+                f"attachment; filename={profile_filename()}".encode(),
+            ),
+        ]
+        await _send_text(send, 200, collapsed.encode(), headers)
+
+
+async def _send_text(
+    send: Send, status_code: int, body: bytes, headers: list
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", CONTENT_TYPE.encode()),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
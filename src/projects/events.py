@@ -0,0 +1,144 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, status
+
+from src.metrics.service import Metric, registry
+from src.notifications import notifications
+from src.projects.schemas import ProjectStateType
+
+# Канал, в который пишет триггер смены состояния проекта (см. миграцию)
+CHANNEL = "project_state"
+
+MAX_SUBSCRIBERS = 1000
+
+QUEUE_SIZE = 100
+
+KEEPALIVE_INTERVAL = 15.0
+
+
+class Subscriber:
+    def __init__(
+        self,
+        states: set[ProjectStateType] | None,
+        industry_ids: set[int] | None,
+    ) -> None:
+        self.states = states
+        self.industry_ids = industry_ids
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(QUEUE_SIZE)
+        # Клиент не успевал читать, часть событий потеряна
+        self.lagged = False
+
+    def matches(self, event: dict[str, Any]) -> bool:
+        if self.states is not None and event["state"] not in self.states:
+            return False
+        if (
+            self.industry_ids is not None
+            and event["industry_id"] not in self.industry_ids
+        ):
+            return False
+        return True
+
+    def put(self, message: bytes) -> None:
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+
+def _message(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+RESET = _message("reset", b"{}")
+
+
+class ProjectEvents:
+    # Одно уведомление из БД раскладывается по очередям всех подписчиков
+    # воркера, медленный подписчик не задерживает остальных
+    def __init__(self) -> None:
+        self.subscribers: set[Subscriber] = set()
+        notifications.subscribe(CHANNEL, self.publish)
+
+    def publish(self, payload: str | None) -> None:
+        if payload is None:
+            # Уведомления могли быть пропущены, клиенту нужно
+            # перечитать проекты
+            for subscriber in self.subscribers:
+                subscriber.put(RESET)
+            return
+
+        event = orjson.loads(payload)
+        message = _message("state", payload.encode())
+        for subscriber in self.subscribers:
+            if subscriber.matches(event):
+                subscriber.put(message)
+
+    def check_capacity(self) -> None:
+        if len(self.subscribers) >= MAX_SUBSCRIBERS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Слишком много подписчиков",
+            )
+
+    async def stream(
+        self,
+        states: set[ProjectStateType] | None,
+        industry_ids: set[int] | None,
+    ) -> AsyncIterator[bytes]:
+        # Подписчик создается внутри генератора: если клиент ушел до
+        # начала ответа, генератор не запустится и подписчик не останется
+        subscriber = Subscriber(states, industry_ids)
+        self.subscribers.add(subscriber)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscriber.queue.get(), KEEPALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+
+                yield message
+
+                if subscriber.lagged and subscriber.queue.empty():
+                    # Очередь дочитана: клиент перечитывает проекты,
+                    # дальше снова идут события
+                    subscriber.lagged = False
+                    yield RESET
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "subscribers": len(self.subscribers),
+            "lagged": sum(s.lagged for s in self.subscribers),
+        }
+
+    def metrics(self) -> list[Metric]:
+        stats = self.stats()
+
+        subscribers = Metric(
+            "project_events_subscribers",
+            "gauge",
+            "Открытые подписки на события проектов",
+        )
+        subscribers.add(stats["subscribers"])
+
+        lagged = Metric(
+            "project_events_lagged_subscribers",
+            "gauge",
+            "Подписчики, не успевающие читать события",
+        )
+        lagged.add(stats["lagged"])
+
+        return [subscribers, lagged]
+
+
+events = ProjectEvents()
+registry.register(events.metrics)
@@ -9,15 +9,15 @@ from sqlalchemy import (
     Text,
 )
 
-from src.models import Base
+from src.models import Base, row_version_columns
 
 project = Table(
     "project",
     Base.metadata,
     Column("id", Integer),
-    Column("owner_id", Integer),
-    Column("address_id", Integer),
-    Column("industry_id", Integer),
+    Column("owner_id", Integer, index=True),
+    Column("address_id", Integer, index=True),
+    Column("industry_id", Integer, index=True),
     Column("name", Text, comment="Название проекта"),
     Column(
         "application_own_amount",
@@ -64,6 +64,7 @@ project = Table(
         ),
         comment="Состояние проекта",
     ),
+    *row_version_columns(),
     ForeignKeyConstraint(
         ["address_id"], ["address.id"], name="project_address_id_fkey"
     ),
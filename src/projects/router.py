@@ -1,189 +1,276 @@
-from fastapi import APIRouter, HTTPException, Response, status
+from functools import partial
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
+from src.bulk import MAX_BULK_ROWS
 from src.constants import PathParamId
+from src.crud.router import Names, add_crud_routes, list_page
+from src.database import DbConnection
+from src.decisions import service as decisions_service
+from src.decisions.schemas import Decision, DecisionFilter, DecisionSort
+from src.fields import Projection
+from src.pagination import Pagination
 from src.projects import service
+from src.projects.events import events
 from src.projects.schemas import (
     Project,
     ProjectCreate,
+    ProjectFilter,
     ProjectPatch,
+    ProjectSort,
+    ProjectStateType,
+    ProjectTransition,
+    ProjectTransitionResult,
     ProjectUpdate,
 )
+from src.responses import RowsJSONResponse
+from src.supports import service as supports_service
+from src.supports.schemas import Support, SupportFilter, SupportSort
+from src.users import service as users_service
+from src.users.schemas import User, UserFilter, UserSort
 
 router = APIRouter(prefix="/projects", tags=["Проекты"])
 
 
 @router.post(
-    "/",
-    status_code=status.HTTP_201_CREATED,
-    summary="Создать новый проект",
+    "/transitions",
+    response_model=list[ProjectTransitionResult],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": None},
+    },
+    summary="Сменить состояние проектов списком",
 )
-async def create_project(project: ProjectCreate):
-    new_project = await service.create_project(project)
+async def transition_projects(
+    transitions: Annotated[
+        list[ProjectTransition], Body(max_length=MAX_BULK_ROWS)
+    ],
+    connection: DbConnection,
+):
+    ids = [transition.id for transition in transitions]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Проект указан в списке несколько раз",
+        )
 
-    headers = {"Location": f"{router.prefix}/{new_project['id']}"}
-    return Response(status_code=status.HTTP_201_CREATED, headers=headers)
+    results = await service.transition_projects(
+        transitions, connection=connection
+    )
+
+    return RowsJSONResponse(results)
 
 
 @router.get(
-    "/",
-    response_model=list[Project],
+    "/events",
+    response_class=StreamingResponse,
     status_code=status.HTTP_200_OK,
-    summary="Получить список проектов",
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": None},
+    },
+    summary="Подписаться на смену состояния проектов (Server-Sent Events)",
+)
+async def stream_project_events(
+    state: Annotated[
+        list[ProjectStateType] | None,
+        Query(description="Только переходы в эти состояния"),
+    ] = None,
+    industry_id: Annotated[
+        list[int] | None, Query(description="Только проекты этих отраслей")
+    ] = None,
+):
+    # Событие reset означает, что часть событий потеряна
+    # и проекты нужно перечитать через GET /projects/
+    events.check_capacity()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(
+        events.stream(
+            set(state) if state else None,
+            set(industry_id) if industry_id else None,
+        ),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
+add_crud_routes(
+    router,
+    service.crud,
+    Names(
+        one="проект",
+        one_of="проекта",
+        new="новый проект",
+        many="проекты",
+        many_of="проектов",
+        all="все проекты",
+    ),
+    read=Project,
+    create=ProjectCreate,
+    update=ProjectUpdate,
+    patch=ProjectPatch,
+    filter=ProjectFilter,
+    sort=ProjectSort,
 )
-async def get_projects(response: Response):
-    db_projects = await service.get_projects()
-
-    response.headers["Content-Location"] = router.prefix
-    return db_projects
 
 
 @router.get(
-    "/{project_id}",
-    response_model=Project,
+    "/{project_id}/dossier",
+    response_class=Response,
     status_code=status.HTTP_200_OK,
     responses={
+        status.HTTP_200_OK: {"content": {"application/json": {}}},
         status.HTTP_404_NOT_FOUND: {"model": None},
     },
-    summary="Получить проект по id",
+    summary="Получить карточку проекта с владельцем, адресом и поддержками",
 )
-async def get_project_by_id(project_id: PathParamId, response: Response):
-    db_project = await service.get_project_by_id(project_id)
+async def get_project_dossier(
+    project_id: PathParamId, connection: DbConnection
+):
+    dossier = await service.get_project_dossier(
+        project_id, connection=connection
+    )
 
-    if db_project is None:
+    if dossier is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-    response.headers["Content-Location"] = f"{router.prefix}/{project_id}"
-    return db_project
-
-
-@router.put(
-    "/",
-    response_model=None,
-    status_code=status.HTTP_204_NO_CONTENT,
-    summary="Заменить данные всех проектов",
-)
-async def update_all_projects(project: ProjectUpdate):
-    db_projects = await service.get_projects()
-
-    if db_projects:
-        await service.update_all_projects(project)
+    # JSON уже собран в БД, повторная валидация Pydantic не нужна
+    headers = {"Content-Location": f"{router.prefix}/{project_id}/dossier"}
+    return Response(
+        content=dossier, media_type="application/json", headers=headers
+    )
 
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-
-# SELECT setval('project_id_seq', (SELECT COALESCE(MAX(id), 0) FROM "project"));
-@router.put(
-    "/{project_id}",
-    response_model=Project,
+@router.get(
+    "/{project_id}/users",
+    response_model=list[User],
     status_code=status.HTTP_200_OK,
     responses={
-        status.HTTP_201_CREATED: {"model": None},
-        status.HTTP_204_NO_CONTENT: {"model": None},
+        status.HTTP_404_NOT_FOUND: {"model": None},
     },
-    summary="Заменить данные проекта или создать новый",
+    summary="Получить пользователей проекта",
 )
-async def update_project(
-    project_id: PathParamId, project: ProjectUpdate, response: Response
+async def get_project_users(
+    project_id: PathParamId,
+    request: Request,
+    response: Response,
+    pagination: Pagination,
+    connection: DbConnection,
+    projection: Annotated[
+        Projection, Depends(users_service.crud.projection_params)
+    ],
+    sort: Annotated[
+        UserSort, Query(description="Поле сортировки, '-' для убывания")
+    ] = "id",
 ):
-    db_project = await service.get_project_by_id(project_id)
-
-    # Если нет, создаем нового с таким id
-    if db_project is None:
-        await service.create_project(project, project_id)
-
-        headers = {"Location": f"{router.prefix}/{project_id}"}
-        return Response(status_code=status.HTTP_201_CREATED, headers=headers)
-    else:
-        response.headers["Content-Location"] = f"{router.prefix}/{project_id}"
-
-    # Если нет изменений, возвращем 204
-    put_fields = project.model_dump()
-    if all(put_fields[key] == db_project[key] for key in put_fields):
-        return Response(
-            status_code=status.HTTP_204_NO_CONTENT, headers=response.headers
-        )
+    return await list_page(
+        users_service.crud,
+        UserFilter(project_id=project_id),
+        sort,
+        pagination,
+        projection,
+        request,
+        response,
+        f"{router.prefix}/{project_id}/users",
+        connection,
+        partial(_ensure_project, project_id, connection),
+    )
 
-    # Если есть, обновляем
-    updated_project = await service.update_project(project, project_id)
-    return updated_project
 
-
-@router.delete(
-    "/",
-    response_model=None,
-    status_code=status.HTTP_204_NO_CONTENT,
-    summary="Удалить все проекты",
-)
-async def delete_all_projects():
-    await service.delete_all_projects()
-
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
-
-
-@router.delete(
-    "/{project_id}",
-    response_model=None,
-    status_code=status.HTTP_204_NO_CONTENT,
+@router.get(
+    "/{project_id}/supports",
+    response_model=list[Support],
+    status_code=status.HTTP_200_OK,
     responses={
         status.HTTP_404_NOT_FOUND: {"model": None},
     },
-    summary="Удалить проект",
-)
-async def delete_project(project_id: PathParamId):
-    db_project = await service.get_project_by_id(project_id)
-
-    if db_project is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-
-    await service.delete_project(project_id)
-
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
-
-
-@router.patch(
-    "/",
-    response_model=None,
-    status_code=status.HTTP_204_NO_CONTENT,
-    summary="Изменить данные всех проектов",
+    summary="Получить поддержки проекта",
 )
-async def patch_all_projects(project: ProjectPatch):
-    db_projects = await service.get_projects()
-
-    if db_projects:
-        await service.update_all_projects(project)
-
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+async def get_project_supports(
+    project_id: PathParamId,
+    request: Request,
+    response: Response,
+    pagination: Pagination,
+    connection: DbConnection,
+    projection: Annotated[
+        Projection, Depends(supports_service.crud.projection_params)
+    ],
+    sort: Annotated[
+        SupportSort, Query(description="Поле сортировки, '-' для убывания")
+    ] = "id",
+):
+    return await list_page(
+        supports_service.crud,
+        SupportFilter(project_id=project_id),
+        sort,
+        pagination,
+        projection,
+        request,
+        response,
+        f"{router.prefix}/{project_id}/supports",
+        connection,
+        partial(_ensure_project, project_id, connection),
+    )
 
 
-@router.patch(
-    "/{project_id}",
-    response_model=Project,
+@router.get(
+    "/{project_id}/supports/{support_id}/decisions",
+    response_model=list[Decision],
     status_code=status.HTTP_200_OK,
     responses={
-        status.HTTP_204_NO_CONTENT: {"model": None},
         status.HTTP_404_NOT_FOUND: {"model": None},
     },
-    summary="Изменить данные проекта",
+    summary="Получить решения по поддержке проекта",
 )
-async def patch_project(
-    project_id: PathParamId, project: ProjectPatch, response: Response
+async def get_project_support_decisions(
+    project_id: PathParamId,
+    support_id: PathParamId,
+    request: Request,
+    response: Response,
+    pagination: Pagination,
+    connection: DbConnection,
+    projection: Annotated[
+        Projection, Depends(decisions_service.crud.projection_params)
+    ],
+    sort: Annotated[
+        DecisionSort, Query(description="Поле сортировки, '-' для убывания")
+    ] = "id",
 ):
-    db_project = await service.get_project_by_id(project_id)
-
-    # Если нет, 404
-    if db_project is None:
-        raise HTTPException(status_code=404)
-    else:
-        response.headers["Content-Location"] = f"{router.prefix}/{project_id}"
-
-    # Если нет изменений, возвращем 204
-    patch_fields = project.model_dump(exclude_unset=True)
-    if all(patch_fields[key] == db_project[key] for key in patch_fields):
-        return Response(
-            status_code=status.HTTP_204_NO_CONTENT, headers=response.headers
+    # Поддержка должна относиться к проекту
+    async def ensure_support() -> None:
+        db_support = await supports_service.crud.get_by_id(
+            support_id, connection=connection
         )
+        if db_support is None or db_support["project_id"] != project_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return await list_page(
+        decisions_service.crud,
+        DecisionFilter(support_id=support_id, project_id=project_id),
+        sort,
+        pagination,
+        projection,
+        request,
+        response,
+        f"{router.prefix}/{project_id}/supports/{support_id}/decisions",
+        connection,
+        ensure_support,
+    )
+
+
+async def _ensure_project(project_id: int, connection: DbConnection) -> None:
+    db_project = await service.crud.get_by_id(project_id, connection=connection)
 
-    # Если есть, обновляем
-    db_project = await service.update_project(project, project_id)
-
-    return db_project
+    if db_project is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -1,8 +1,10 @@
-from typing import Literal
+from dataclasses import dataclass
+from typing import Annotated, Literal
 
+from fastapi import Query
 from pydantic import BaseModel, Field, field_validator
 
-from src.schemas import BasePatchSchema
+from src.schemas import BasePatchSchema, VersionedSchema
 
 ProjectStateType = Literal[
     "APPLICANTION_SHORT",
@@ -17,7 +19,6 @@ ProjectStateType = Literal[
 
 
 class ProjectBase(BaseModel):
-    user_id: int | None = None
     owner_id: int | None = None
     address_id: int | None = None
     industry_id: int | None = None
@@ -66,12 +67,11 @@ class ProjectUpdate(ProjectBase):
     pass
 
 
-class Project(ProjectBase):
+class Project(ProjectBase, VersionedSchema):
     id: int
 
 
 class ProjectPatch(ProjectBase, BasePatchSchema):
-    user_id: int | None = None
     owner_id: int | None = None
     address_id: int | None = None
     industry_id: int | None = None
@@ -108,3 +108,49 @@ class ProjectPatch(ProjectBase, BasePatchSchema):
     state: ProjectStateType = Field(
         default=None, description="Состояние проекта"
     )
+
+
+ProjectSort = Literal[
+    "id",
+    "-id",
+    "name",
+    "-name",
+    "state",
+    "-state",
+    "application_support_amount",
+    "-application_support_amount",
+]
+
+
+@dataclass
+class ProjectFilter:
+    state: Annotated[
+        list[ProjectStateType] | None, Query(description="Состояние проекта")
+    ] = None
+    industry_id: Annotated[int | None, Query(description="ID отрасли")] = None
+    owner_id: Annotated[int | None, Query(description="ID владельца")] = None
+    address_id: Annotated[int | None, Query(description="ID адреса")] = None
+    user_id: Annotated[int | None, Query(description="ID пользователя")] = None
+
+
+class ProjectTransition(BaseModel):
+    id: int = Field(description="ID проекта")
+    from_state: ProjectStateType = Field(
+        description="Ожидаемое текущее состояние"
+    )
+    to_state: ProjectStateType = Field(description="Новое состояние")
+
+
+ProjectTransitionStatus = Literal["applied", "conflict", "invalid", "not_found"]
+
+
+class ProjectTransitionResult(BaseModel):
+    id: int = Field(description="ID проекта")
+    status: ProjectTransitionStatus = Field(
+        description="applied - выполнен, conflict - состояние уже другое, \
+            invalid - переход запрещен, not_found - проекта нет"
+    )
+    state: ProjectStateType | None = Field(
+        description="Состояние проекта после запроса"
+    )
+    version: int | None = Field(description="Версия строки после перехода")
@@ -1,80 +1,253 @@
 from typing import Any
 
-from sqlalchemy import delete, insert, select, update
-
-from src.database import execute, fetch_all, fetch_one
+from sqlalchemy import (
+    Function,
+    Integer,
+    Select,
+    Table,
+    Text,
+    cast,
+    column,
+    func,
+    literal_column,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.addresses.models import address
+from src.crud.service import CrudService
+from src.database import fetch_all, fetch_one
+from src.decisions.models import decision
+from src.loaders import Relation
+from src.models import (
+    business_man,
+    business_org,
+    city,
+    district,
+    industry,
+    owner,
+    owner_contact,
+    user_project,
+)
 from src.projects import models, schemas
-
-
-async def create_project(
-    project: schemas.ProjectCreate | schemas.ProjectUpdate, id: int = None
-) -> dict[str, Any]:
-    insert_query = (
-        insert(models.project)
-        .values(project.model_dump())
-        .returning(models.project)
+from src.projects.states import TRANSITIONS, state_guard
+from src.supports.models import support
+
+RELATIONS = {
+    "owner": Relation("owner_id", owner.c.id),
+    "address": Relation("address_id", address.c.id),
+    "industry": Relation("industry_id", industry.c.id),
+    "supports": Relation("id", support.c.project_id, True, (support.c.id,)),
+}
+
+
+def filter_projects(
+    select_query: Select, filters: schemas.ProjectFilter
+) -> Select:
+    if filters.state:
+        select_query = select_query.where(
+            models.project.c.state.in_(filters.state)
+        )
+    if filters.industry_id is not None:
+        select_query = select_query.where(
+            models.project.c.industry_id == filters.industry_id
+        )
+    if filters.owner_id is not None:
+        select_query = select_query.where(
+            models.project.c.owner_id == filters.owner_id
+        )
+    if filters.address_id is not None:
+        select_query = select_query.where(
+            models.project.c.address_id == filters.address_id
+        )
+    if filters.user_id is not None:
+        select_query = select_query.where(
+            models.project.c.id.in_(
+                select(user_project.c.project_id).where(
+                    user_project.c.user_id == filters.user_id
+                )
+            )
+        )
+
+    return select_query
+
+
+crud = CrudService(models.project, filter_projects, RELATIONS, state_guard)
+
+
+def _json_object(table: Table, **nested: Any) -> Function:
+    args = []
+    for key, value in [*((c.name, c) for c in table.c), *nested.items()]:
+        args += [literal_column(f"'{key}'"), value]
+
+    return func.json_build_object(*args)
+
+
+def _json_array(element: Any, *order_by: Any) -> Function:
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(element, *order_by)),
+        literal_column("'[]'::json"),
     )
 
-    if id is not None:
-        insert_query = insert_query.values(id=id)
-
-    db_project = await fetch_one(insert_query)
-
-    return db_project
-
-
-async def get_projects() -> list[dict[str, Any]]:
-    select_query = select(models.project)
 
-    db_projects = await fetch_all(select_query)
-
-    return db_projects
-
-
-async def get_project_by_id(project_id: int) -> dict[str, Any] | None:
-    select_query = select(models.project).where(
-        models.project.c.id == project_id
+async def get_project_dossier(
+    project_id: int, connection: AsyncConnection | None = None
+) -> str | None:
+    # Карточка проекта целиком собирается в Postgres одним запросом,
+    # на выходе готовый JSON-текст
+    business_org_json = (
+        select(_json_object(business_org))
+        .where(business_org.c.id == owner.c.business_org_id)
+        .scalar_subquery()
     )
-
-    db_project = await fetch_one(select_query)
-
-    return db_project if db_project is not None else None
-
-
-async def update_project(
-    project: schemas.ProjectUpdate | schemas.ProjectPatch, id: int
-) -> dict[str, Any]:
-    update_query = (
-        update(models.project)
-        .where(models.project.c.id == id)
-        .values(project.model_dump(exclude_unset=True))
-        .returning(models.project)
+    business_man_json = (
+        select(_json_object(business_man))
+        .where(business_man.c.id == owner.c.business_man_id)
+        .scalar_subquery()
     )
-
-    updated_project = await fetch_one(update_query)
-
-    return updated_project
-
-
-async def update_all_projects(
-    project: schemas.ProjectUpdate | schemas.ProjectPatch
-) -> None:
-    update_query = update(models.project).values(
-        project.model_dump(exclude_unset=True)
+    contacts_json = (
+        select(_json_array(_json_object(owner_contact), owner_contact.c.id))
+        .where(owner_contact.c.owner_id == owner.c.id)
+        .scalar_subquery()
     )
-
-    await execute(update_query)
-
-
-async def delete_project(project_id: int) -> None:
-    delete_query = delete(models.project).where(
-        models.project.c.id == project_id
+    owner_json = (
+        select(
+            _json_object(
+                owner,
+                business_org=business_org_json,
+                business_man=business_man_json,
+                contacts=contacts_json,
+            )
+        )
+        .where(owner.c.id == models.project.c.owner_id)
+        .scalar_subquery()
+    )
+    address_json = (
+        select(
+            _json_object(address, city=city.c.name, district=district.c.name)
+        )
+        .select_from(address.outerjoin(city).outerjoin(district))
+        .where(address.c.id == models.project.c.address_id)
+        .scalar_subquery()
+    )
+    industry_json = (
+        select(_json_object(industry))
+        .where(industry.c.id == models.project.c.industry_id)
+        .scalar_subquery()
+    )
+    decisions_json = (
+        select(
+            _json_array(
+                _json_object(decision),
+                decision.c.decision_date,
+                decision.c.id,
+            )
+        )
+        .where(decision.c.support_id == support.c.id)
+        .scalar_subquery()
+    )
+    supports_json = (
+        select(
+            _json_array(
+                _json_object(support, decisions=decisions_json),
+                support.c.date_start,
+                support.c.id,
+            )
+        )
+        .where(support.c.project_id == models.project.c.id)
+        .scalar_subquery()
     )
 
-    await execute(delete_query)
-
-
-async def delete_all_projects() -> None:
-    delete_query = delete(models.project)
-
-    await execute(delete_query)
+    select_query = select(
+        cast(
+            _json_object(
+                models.project,
+                owner=owner_json,
+                address=address_json,
+                industry=industry_json,
+                supports=supports_json,
+            ),
+            Text,
+        ).label("dossier")
+    ).where(models.project.c.id == project_id)
+
+    db_dossier = await fetch_one(select_query, connection)
+
+    return db_dossier["dossier"] if db_dossier is not None else None
+
+
+async def transition_projects(
+    transitions: list[schemas.ProjectTransition],
+    connection: AsyncConnection | None = None,
+) -> list[dict[str, Any]]:
+    allowed = [
+        transition
+        for transition in transitions
+        if transition.to_state in TRANSITIONS[transition.from_state]
+    ]
+
+    db_projects = {}
+    if allowed:
+        # Все переходы одним UPDATE ... FROM (VALUES ...): проект
+        # меняется, только если его состояние все еще ожидаемое
+        state_type = models.project.c.state.type
+        transition_values = values(
+            column("id", Integer),
+            column("from_state", state_type),
+            column("to_state", state_type),
+            name="transition",
+        ).data([(t.id, t.from_state, t.to_state) for t in allowed])
+        update_query = (
+            update(models.project)
+            .values(state=transition_values.c.to_state)
+            .where(
+                models.project.c.id == transition_values.c.id,
+                models.project.c.state == transition_values.c.from_state,
+            )
+            .returning(
+                models.project.c.id,
+                models.project.c.state,
+                models.project.c.version,
+            )
+        )
+        db_projects = {
+            db_project["id"]: db_project
+            for db_project in await fetch_all(update_query, connection)
+        }
+
+    applied = set(db_projects)
+    rest = [t.id for t in transitions if t.id not in applied]
+    if rest:
+        select_query = select(
+            models.project.c.id,
+            models.project.c.state,
+            models.project.c.version,
+        ).where(models.project.c.id.in_(rest))
+        for db_project in await fetch_all(select_query, connection):
+            db_projects[db_project["id"]] = db_project
+
+    results = []
+    for transition in transitions:
+        db_project = db_projects.get(transition.id)
+        if db_project is None:
+            status = "not_found"
+        elif transition.id in applied:
+            status = "applied"
+        elif transition.to_state not in TRANSITIONS[transition.from_state]:
+            status = "invalid"
+        else:
+            status = "conflict"
+
+        results.append(
+            {
+                "id": transition.id,
+                "status": status,
+                "state": db_project and db_project["state"],
+                "version": db_project and db_project["version"],
+            }
+        )
+
+    return results
@@ -0,0 +1,62 @@
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, or_, true
+
+from src.crud.service import RowGuard
+from src.projects import models
+from src.projects.schemas import ProjectStateType
+
+# Допустимые переходы состояния проекта,
+# см. docs/images/states_projects.png
+TRANSITIONS: dict[ProjectStateType, frozenset[ProjectStateType]] = {
+    "APPLICANTION_SHORT": frozenset({"APPLICANTION_FULL", "DELETED"}),
+    "APPLICANTION_FULL": frozenset(
+        {"PROJECT_IN_COMISSION", "ENDED", "FREEZE", "ARCHIVE"}
+    ),
+    # Комиссия одобряет проект или возвращает заявку на доработку
+    "PROJECT_IN_COMISSION": frozenset(
+        {"PROJECT_ON_SUPPORT", "APPLICANTION_FULL"}
+    ),
+    "PROJECT_ON_SUPPORT": frozenset({"ENDED", "FREEZE", "ARCHIVE"}),
+    "DELETED": frozenset(),
+    "ENDED": frozenset(),
+    "FREEZE": frozenset(),
+    "ARCHIVE": frozenset(),
+}
+
+
+def can_transition(
+    source: ProjectStateType | None, target: ProjectStateType
+) -> bool:
+    # Состояние, оставшееся прежним, переходом не считается.
+    # Проекту без состояния можно назначить любое
+    return source is None or source == target or target in TRANSITIONS[source]
+
+
+def sources(target: ProjectStateType) -> list[ProjectStateType]:
+    return [state for state in TRANSITIONS if can_transition(state, target)]
+
+
+def _state_where(values: dict[str, Any]) -> ColumnElement:
+    # Строка меняется, только если из ее состояния разрешен переход
+    state = values.get("state")
+    if state is None:
+        return true()
+
+    return or_(
+        models.project.c.state.in_(sources(state)),
+        models.project.c.state.is_(None),
+    )
+
+
+def _check_transition(row: dict[str, Any], values: dict[str, Any]) -> None:
+    state = values.get("state")
+    if state is not None and not can_transition(row["state"], state):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Переход из {row['state']} в {state} запрещен",
+        )
+
+
+state_guard = RowGuard(frozenset({"state"}), _state_where, _check_transition)
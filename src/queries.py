@@ -0,0 +1,133 @@
+import logging
+import re
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.exc import DBAPIError
+
+from src.config import settings
+from src.database import QueryStats, engine
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних отчетов хранит воркер
+MAX_REPORTS = 100
+
+# Нормализация SQL: значения и списки IN (...) любой длины дают
+# один отпечаток, так N+1 по одному запросу на строку виден сразу
+_FINGERPRINT_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+(?:::[\w ]+(?:\[\])?)?"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint(statement: str) -> str:
+    for pattern, replacement in _FINGERPRINT_PATTERNS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+_LOCKING_CLAUSE = re.compile(r"\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE)\b", re.I)
+
+
+def _is_read(statement: str) -> bool:
+    # WITH может содержать INSERT/UPDATE/DELETE, поэтому только SELECT,
+    # и без блокировки строк
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return False
+    return _LOCKING_CLAUSE.search(statement) is None
+
+
+async def explain(statement: str, parameters: Any) -> str:
+    # ANALYZE выполняет запрос еще раз. Для записи это блокировки строк,
+    # расход последовательностей и срабатывание триггеров (change_log,
+    # NOTIFY, версии), поэтому изменения объясняются без ANALYZE
+    options = "(ANALYZE, BUFFERS)" if _is_read(statement) else ""
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN {options} {statement}", tuple(parameters)
+            )
+            return "\n".join(row[0] for row in result)
+        except DBAPIError as e:
+            return f"EXPLAIN не выполнен: {e.orig}"
+        finally:
+            await transaction.rollback()
+
+
+class QueryReports:
+    def __init__(self) -> None:
+        self.reports: deque[dict[str, Any]] = deque(maxlen=MAX_REPORTS)
+
+    async def report(
+        self, method: str, route: str, stats: QueryStats
+    ) -> dict[str, Any] | None:
+        fingerprints: Counter[str] = Counter()
+        for statement, count in stats.statements.items():
+            fingerprints[fingerprint(statement)] += count
+
+        repeated = [
+            {"fingerprint": sql, "count": count}
+            for sql, count in fingerprints.most_common()
+            if count >= settings.DB_QUERY_REPEAT_THRESHOLD
+        ]
+        slow = [
+            {
+                "statement": statement,
+                "seconds": seconds,
+                "plan": await explain(statement, parameters),
+            }
+            for statement, parameters, seconds in stats.slow
+        ]
+        over_budget = stats.budget is not None and stats.queries > stats.budget
+
+        if not repeated and not slow and not over_budget:
+            return None
+
+        report = {
+            "method": method,
+            "route": route,
+            "created_at": datetime.now(timezone.utc),
+            "queries": stats.queries,
+            "budget": stats.budget,
+            "seconds": stats.seconds,
+            "repeated": repeated,
+            "slow": slow,
+        }
+        self.reports.append(report)
+
+        for item in repeated:
+            logger.warning(
+                "%s %s: запрос повторен %d раз (N+1?): %s",
+                method,
+                route,
+                item["count"],
+                item["fingerprint"],
+            )
+        for item in slow:
+            logger.warning(
+                "%s %s: медленный запрос %.1f мс: %s\n%s",
+                method,
+                route,
+                item["seconds"] * 1000,
+                item["statement"],
+                item["plan"],
+            )
+        if over_budget:
+            logger.warning(
+                "%s %s: %d запросов к БД при бюджете %d",
+                method,
+                route,
+                stats.queries,
+                stats.budget,
+            )
+
+        return report
+
+
+reports = QueryReports()
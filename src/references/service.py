@@ -0,0 +1,161 @@
+import asyncio
+from typing import Any
+
+from sqlalchemy import Table, select
+
+from src.database import fetch_all, untracked_queries
+from src.metrics.service import Metric, registry
+from src.models import city, district, industry, support_org, support_programm
+from src.notifications import notifications
+
+# Канал, в который пишут триггеры справочников (см. миграцию)
+CHANNEL = "reference_changed"
+
+
+class ReferenceNotFound(Exception):
+    def __init__(self, fields: list[str]) -> None:
+        super().__init__(fields)
+        self.fields = fields
+
+
+def reference_error(field: str) -> dict[str, Any]:
+    return {
+        "type": "foreign_key",
+        "loc": ["body", field],
+        "msg": "Запись справочника не найдена",
+    }
+
+
+class TableCache:
+    def __init__(self, table: Table) -> None:
+        self.table = table
+        self.rows: dict[int, dict[str, Any]] = {}
+        self.stale = True
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        with untracked_queries():
+            rows = await fetch_all(select(self.table))
+        self.rows = {row["id"]: row for row in rows}
+        self.loads += 1
+
+    async def get_rows(self) -> dict[int, dict[str, Any]]:
+        if not self.stale:
+            self.hits += 1
+            return self.rows
+
+        self.misses += 1
+        async with self.lock:
+            # Пока ждали блокировку, таблицу мог перечитать другой запрос
+            if self.stale:
+                self.stale = False
+                try:
+                    await self.load()
+                except BaseException:
+                    self.stale = True
+                    raise
+
+        return self.rows
+
+
+class ReferenceCache:
+    def __init__(self, tables: list[Table]) -> None:
+        self.tables = {table.name: TableCache(table) for table in tables}
+        notifications.subscribe(CHANNEL, self.invalidate)
+
+    async def start(self) -> None:
+        for table_cache in self.tables.values():
+            await table_cache.get_rows()
+
+    def stop(self) -> None:
+        # После остановки уведомлений кэш не сбрасывается, не отдаем его
+        for table_cache in self.tables.values():
+            table_cache.stale = True
+            table_cache.rows = {}
+
+    def invalidate(self, table_name: str | None = None) -> None:
+        for name, table_cache in self.tables.items():
+            if table_name is None or name == table_name:
+                table_cache.stale = True
+
+    async def get(self, table_name: str, id: int) -> dict[str, Any] | None:
+        rows = await self.tables[table_name].get_rows()
+        return rows.get(id)
+
+    async def find_id(self, table_name: str, name: str) -> int | None:
+        name = name.strip().lower()
+        rows = await self.tables[table_name].get_rows()
+        for id, row in rows.items():
+            if row["name"] and row["name"].strip().lower() == name:
+                return id
+        return None
+
+    async def missing_references(
+        self, table: Table, values: dict[str, Any]
+    ) -> list[str]:
+        # Внешние ключи на справочники проверяются по кэшу, без запроса в БД
+        missing = []
+        for foreign_key in table.foreign_keys:
+            reference = foreign_key.column.table.name
+            column = foreign_key.parent.name
+            value = values.get(column)
+            if reference in self.tables and value is not None:
+                if await self.get(reference, value) is None:
+                    missing.append(column)
+        return missing
+
+    async def check_references(
+        self, table: Table, values: dict[str, Any]
+    ) -> None:
+        missing = await self.missing_references(table, values)
+        if missing:
+            raise ReferenceNotFound(missing)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "rows": len(table_cache.rows),
+                "stale": table_cache.stale,
+                "hits": table_cache.hits,
+                "misses": table_cache.misses,
+                "loads": table_cache.loads,
+            }
+            for name, table_cache in self.tables.items()
+        }
+
+    def metrics(self) -> list[Metric]:
+        rows = Metric(
+            "reference_cache_rows", "gauge", "Строк справочника в кэше", "max"
+        )
+        hits = Metric(
+            "reference_cache_hits_total",
+            "counter",
+            "Обращения к кэшу справочника без чтения из БД",
+        )
+        misses = Metric(
+            "reference_cache_misses_total",
+            "counter",
+            "Обращения к кэшу справочника с перечитыванием таблицы",
+        )
+        loads = Metric(
+            "reference_cache_loads_total",
+            "counter",
+            "Чтения таблицы справочника из БД",
+        )
+
+        for name, stats in self.stats().items():
+            rows.add(stats["rows"], table=name)
+            hits.add(stats["hits"], table=name)
+            misses.add(stats["misses"], table=name)
+            loads.add(stats["loads"], table=name)
+
+        return [rows, hits, misses, loads]
+
+
+cache = ReferenceCache(
+    [city, district, industry, support_org, support_programm]
+)
+registry.register(cache.metrics)
@@ -0,0 +1,27 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    # numeric приходит из БД как Decimal, в схемах это float
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def dumps(content: Any, option: int = 0) -> bytes:
+    # Ключи строк из БД — quoted_name SQLAlchemy, подкласс str, без
+    # OPT_NON_STR_KEYS orjson их не принимает
+    return orjson.dumps(
+        content, default=_default, option=option | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class RowsJSONResponse(JSONResponse):
+    # Строки из БД уже прошли валидацию при записи, поэтому отдаются
+    # напрямую через orjson, минуя повторную валидацию response_model
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
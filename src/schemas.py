@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict, model_validator
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class BaseSchema(BaseModel):
@@ -15,3 +17,8 @@ class BasePatchSchema(BaseModel):
             raise ValueError("Хотя бы одно поле должно быть указано")
 
         return data
+
+
+class VersionedSchema(BaseModel):
+    version: int = Field(description="Версия строки, передается в ETag")
+    updated_at: datetime = Field(description="Время последнего изменения")
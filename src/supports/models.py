@@ -11,7 +11,7 @@ from sqlalchemy import (
     UniqueConstraint,
 )
 
-from src.models import Base
+from src.models import Base, row_version_columns
 
 support = Table(
     "support",
@@ -20,6 +20,7 @@ support = Table(
     Column(
         "project_id",
         Integer,
+        index=True,
         comment="ID проекта к которому относится поддержка",
     ),
     Column(
@@ -55,6 +56,7 @@ support = Table(
         ),
     ),
     Column("desc", Text, comment="Описание"),
+    *row_version_columns(),
     ForeignKeyConstraint(
         ["project_id"], ["project.id"], name="support_project_id_fkey"
     ),
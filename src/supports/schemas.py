@@ -1,9 +1,11 @@
+from dataclasses import dataclass
 from datetime import date
-from typing import Literal
+from typing import Annotated, Literal
 
+from fastapi import Query
 from pydantic import Field, field_validator
 
-from src.schemas import BasePatchSchema, BaseSchema
+from src.schemas import BasePatchSchema, BaseSchema, VersionedSchema
 
 SupportType = Literal["FINANCE", "CREDIT", "EARTH", "EQUIP", "TECH"]
 
@@ -43,7 +45,7 @@ class SupportUpdate(SupportBase):
     pass
 
 
-class Support(SupportBase):
+class Support(SupportBase, VersionedSchema):
     id: int
 
     # FIXME: https://github.com/zhanymkanov/fastapi-best-practices#3-use-dependencies-for-data-validation-vs-db
@@ -95,3 +97,22 @@ class SupportPatch(SupportBase, BasePatchSchema):
     amount: float | None = Field(default=None, description="Размер поддержки")
     unit: UnitType | None = Field(default=None, description="Единицы измерения")
     desc: str | None = Field(default=None, description="Описание")
+
+
+SupportSort = Literal[
+    "id", "-id", "date_start", "-date_start", "amount", "-amount"
+]
+
+
+@dataclass
+class SupportFilter:
+    project_id: Annotated[int | None, Query(description="ID проекта")] = None
+    type_code: Annotated[
+        list[SupportType] | None, Query(description="Вид поддержки")
+    ] = None
+    date_start_from: Annotated[
+        date | None, Query(description="Дата начала выделения поддержки, с")
+    ] = None
+    date_start_to: Annotated[
+        date | None, Query(description="Дата начала выделения поддержки, по")
+    ] = None
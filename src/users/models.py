@@ -7,7 +7,7 @@ from sqlalchemy import (
     Text,
 )
 
-from src.models import Base
+from src.models import Base, row_version_columns
 
 user = Table(
     "user",
@@ -28,6 +28,7 @@ user = Table(
         ),
         comment="Роль пользователя",
     ),
+    *row_version_columns(),
     PrimaryKeyConstraint("id", name="user_pkey"),
     comment="Пользователи системы",
 )
@@ -1,12 +1,14 @@
-from typing import Literal
+from dataclasses import dataclass
+from typing import Annotated, Literal
 
+from fastapi import Query
 from pydantic import (
     EmailStr,
     Field,
     field_validator,
 )
 
-from src.schemas import BasePatchSchema, BaseSchema
+from src.schemas import BasePatchSchema, BaseSchema, VersionedSchema
 
 RoleCode = Literal[
     "ADMIN", "PROJECT_EDITOR", "PROJECT_VIEWER", "REPORT_EXPORTER_ALL"
@@ -33,7 +35,7 @@ class UserBase(BaseSchema):
         return value.lower() if value else None
 
 
-class User(UserBase):
+class User(UserBase, VersionedSchema):
     id: int
 
 
@@ -55,3 +57,17 @@ class UserPatch(UserBase, BasePatchSchema):
     role_code: RoleCode | None = Field(
         default=None, description="Роль пользователя"
     )
+
+
+UserSort = Literal["id", "-id", "last_name", "-last_name", "email", "-email"]
+
+
+@dataclass
+class UserFilter:
+    role_code: Annotated[
+        list[RoleCode] | None, Query(description="Роль пользователя")
+    ] = None
+    email: Annotated[
+        str | None, Query(description="Адрес электронной почты")
+    ] = None
+    project_id: Annotated[int | None, Query(description="ID проекта")] = None
@@ -0,0 +1,264 @@
+import re
+
+import pytest
+
+PROJECT = {
+    "name": "проект",
+    "application_own_amount": 100,
+    "application_support_amount": 200,
+    "work_place_count": 10,
+    "nalog_amount": 50,
+    "state": "APPLICANTION_SHORT",
+}
+
+
+def create_project(client, **values) -> int:
+    response = client.post("/projects/", json={**PROJECT, **values})
+    assert response.status_code == 201, response.text
+    return int(response.headers["Location"].rsplit("/", 1)[1])
+
+
+def next_url(response) -> str | None:
+    link = response.headers.get("Link")
+    if link is None:
+        return None
+    return re.match(r"<([^>]+)>", link).group(1)
+
+
+def read_pages(client, url: str) -> list[dict]:
+    rows = []
+    while url is not None:
+        response = client.get(url)
+        assert response.status_code == 200, response.text
+        rows += response.json()
+        url = next_url(response)
+    return rows
+
+
+@pytest.mark.parametrize(
+    ("sort", "names"),
+    [
+        ("name", ["А", "Б", "В", None, None]),
+        ("-name", ["В", "Б", "А", None, None]),
+    ],
+)
+def test_keyset_pages_keep_nulls_last(client, sql, sort, names):
+    ids = [create_project(client, name=name) for name in "бавгд"]
+    sql("UPDATE project SET name = NULL WHERE id = ANY(:ids)", ids=ids[3:])
+
+    rows = read_pages(client, f"/projects/?sort={sort}&limit=2")
+
+    assert [row["name"] for row in rows] == names
+    # NULL в ключе сортировки упорядочены по id
+    assert [row["id"] for row in rows][3:] == sorted(ids[3:], reverse="-" in sort)
+    assert len({row["id"] for row in rows}) == len(ids)
+
+
+def test_cursor_from_another_sort_is_rejected(client):
+    for name in "аб":
+        create_project(client, name=name)
+
+    response = client.get("/projects/?sort=name&limit=1")
+    cursor = re.search(r"after=([^&>]+)", response.headers["Link"]).group(1)
+
+    response = client.get(f"/projects/?sort=-name&limit=1&after={cursor}")
+    assert response.status_code == 400
+
+    response = client.get("/projects/?after=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_includes_fit_read_budget(client, sql):
+    project_ids = [create_project(client) for _ in range(3)]
+    for project_id in project_ids:
+        for _ in range(2):
+            response = client.post(
+                "/supports/",
+                json={
+                    "project_id": project_id,
+                    "date_start": "2024-01-01",
+                    "type_code": "FINANCE",
+                    "amount": 1000,
+                    "unit": "RUB",
+                },
+            )
+            assert response.status_code == 201, response.text
+
+    # Связи грузятся пачкой на всю страницу: при N+1 строгий бюджет
+    # ответил бы 500
+    response = client.get(
+        "/projects/?include=supports,owner,address,industry&count=true"
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["X-Total-Count"]
+    assert [len(row["supports"]) for row in response.json()] == [2, 2, 2]
+
+
+def test_strict_budget_fails_request(client, monkeypatch):
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET", 0)
+
+    response = client.get("/changes/")
+
+    assert response.status_code == 500
+    assert response.json()["budget"] == 0
+    assert response.json()["route"] == "/changes/"
+
+
+def test_put_upsert_creates_replaces_and_skips_unchanged(client):
+    body = {**PROJECT, "name": "замена"}
+
+    created = client.put("/projects/100", json=body)
+    assert created.status_code == 201
+    assert created.headers["Location"] == "/projects/100"
+
+    # Те же значения: IS DISTINCT FROM не пропускает UPDATE,
+    # версия и ETag прежние
+    unchanged = client.put("/projects/100", json=body)
+    assert unchanged.status_code == 204
+    assert unchanged.headers["ETag"] == created.headers["ETag"]
+
+    replaced = client.put("/projects/100", json={**body, "work_place_count": 11})
+    assert replaced.status_code == 200
+    assert replaced.json()["version"] == 2
+    assert replaced.headers["ETag"] != created.headers["ETag"]
+
+    response = client.get(
+        "/projects/100", headers={"If-None-Match": replaced.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_if_match_rejects_stale_version(client):
+    project_id = create_project(client)
+    etag = client.get(f"/projects/{project_id}").headers["ETag"]
+
+    response = client.patch(
+        f"/projects/{project_id}",
+        json={"description": "первое"},
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == 200
+
+    response = client.patch(
+        f"/projects/{project_id}",
+        json={"description": "второе"},
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == 412
+
+
+def test_recreated_row_gets_new_etag(client):
+    created = client.put("/projects/200", json=PROJECT)
+    assert client.delete("/projects/200").status_code == 204
+
+    recreated = client.put("/projects/200", json={**PROJECT, "name": "другой"})
+
+    assert recreated.status_code == 201
+    assert recreated.headers["ETag"] != created.headers["ETag"]
+    response = client.get(
+        "/projects/200", headers={"If-None-Match": created.headers["ETag"]}
+    )
+    assert response.status_code == 200
+
+
+def test_patch_rejects_forbidden_transition(client):
+    project_id = create_project(client, state="APPLICANTION_SHORT")
+
+    response = client.patch(f"/projects/{project_id}", json={"state": "ENDED"})
+
+    assert response.status_code == 409
+
+
+def test_bulk_transitions(client):
+    applied = create_project(client, state="APPLICANTION_SHORT")
+    conflict = create_project(client, state="APPLICANTION_FULL")
+    invalid = create_project(client, state="APPLICANTION_SHORT")
+
+    response = client.post(
+        "/projects/transitions",
+        json=[
+            {
+                "id": applied,
+                "from_state": "APPLICANTION_SHORT",
+                "to_state": "APPLICANTION_FULL",
+            },
+            {
+                "id": conflict,
+                "from_state": "APPLICANTION_SHORT",
+                "to_state": "APPLICANTION_FULL",
+            },
+            {
+                "id": invalid,
+                "from_state": "APPLICANTION_SHORT",
+                "to_state": "ENDED",
+            },
+            {
+                "id": 999,
+                "from_state": "APPLICANTION_SHORT",
+                "to_state": "DELETED",
+            },
+        ],
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == [
+        {
+            "id": applied,
+            "status": "applied",
+            "state": "APPLICANTION_FULL",
+            "version": 2,
+        },
+        {
+            "id": conflict,
+            "status": "conflict",
+            "state": "APPLICANTION_FULL",
+            "version": 1,
+        },
+        {
+            "id": invalid,
+            "status": "invalid",
+            "state": "APPLICANTION_SHORT",
+            "version": 1,
+        },
+        {"id": 999, "status": "not_found", "state": None, "version": None},
+    ]
+
+
+def test_bulk_transitions_reject_duplicate_ids(client):
+    project_id = create_project(client)
+    transition = {
+        "id": project_id,
+        "from_state": "APPLICANTION_SHORT",
+        "to_state": "APPLICANTION_FULL",
+    }
+
+    response = client.post("/projects/transitions", json=[transition] * 2)
+
+    assert response.status_code == 422
+
+
+def test_change_feed_pages_without_gaps(client):
+    head = client.get("/changes/head").json()
+
+    project_id = create_project(client)
+    client.patch(f"/projects/{project_id}", json={"description": "изменен"})
+    client.delete(f"/projects/{project_id}")
+
+    changes, cursor = [], head
+    while True:
+        page = client.get(f"/changes/?since={cursor}&limit=1").json()
+        changes += page["changes"]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+
+    assert [(c["operation"], c["version"]) for c in changes] == [
+        ("INSERT", 1),
+        ("UPDATE", 2),
+        ("DELETE", 2),
+    ]
+    # Курсор после последнего изменения: новых нет, курсор тот же
+    page = client.get(f"/changes/?since={cursor}").json()
+    assert page == {"changes": [], "cursor": cursor, "has_more": False}
@@ -0,0 +1,142 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from src import pagination
+from src.changes import service as changes_service
+from src.crud.service import check_schemas
+from src.database import QueryBudgetExceeded, QueryStats
+from src.projects import models, schemas
+
+
+def compile(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def page(**params) -> pagination.PaginationParams:
+    return pagination.PaginationParams(**{"limit": 2, **params})
+
+
+@pytest.mark.parametrize("sort", ["name", "-name"])
+def test_paginate_puts_nulls_last(sort):
+    query = pagination.paginate(
+        select(models.project), models.project, sort, page()
+    )
+
+    assert "NULLS LAST" in compile(query)
+
+
+@pytest.mark.parametrize("sort", ["name", "-name"])
+def test_paginate_after_value_keeps_null_tail(sort):
+    cursor = pagination.encode_cursor(sort, {"name": "Б", "id": 7})
+    query = pagination.paginate(
+        select(models.project), models.project, sort, page(after=cursor)
+    )
+
+    sql = compile(query)
+    assert "(project.name, project.id)" in sql
+    assert "project.name IS NULL" in sql
+
+
+def test_paginate_after_null_reads_only_null_tail():
+    cursor = pagination.encode_cursor("name", {"name": None, "id": 7})
+    query = pagination.paginate(
+        select(models.project), models.project, "name", page(after=cursor)
+    )
+
+    sql = compile(query)
+    assert "project.name IS NULL AND project.id >" in sql
+    assert "(project.name, project.id)" not in sql
+
+
+def test_cursor_roundtrip():
+    column = models.project.c.name
+    cursor = pagination.encode_cursor("-name", {"name": "А", "id": 3})
+
+    assert pagination.decode_cursor(cursor, "-name", column) == ("А", 3)
+
+
+def encode(payload: str) -> str:
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+@pytest.mark.parametrize(
+    ("cursor", "sort"),
+    [
+        ("не base64", "name"),
+        (encode("{}"), "name"),
+        (encode('["name", "А", "1"]'), "name"),
+        (encode('["-name", "А", 1]'), "name"),
+        (encode('["id", null, 1]'), "id"),
+    ],
+)
+def test_bad_cursor_is_client_error(cursor, sort):
+    column = models.project.c[sort]
+
+    with pytest.raises(HTTPException) as error:
+        pagination.decode_cursor(cursor, sort, column)
+
+    assert error.value.status_code == 400
+
+
+def test_split_page_returns_cursor_of_last_row():
+    rows = [{"id": id, "name": None} for id in (1, 2, 3)]
+
+    rows, cursor = pagination.split_page(rows, "name", page())
+
+    assert [row["id"] for row in rows] == [1, 2]
+    assert pagination.decode_cursor(
+        cursor, "name", models.project.c.name
+    ) == (None, 2)
+
+
+def test_change_cursor():
+    cursor = changes_service.encode_cursor(5, 3)
+
+    assert changes_service.decode_cursor(cursor) == (5, 3)
+    with pytest.raises(HTTPException) as error:
+        changes_service.decode_cursor("5")
+    assert error.value.status_code == 400
+
+
+def test_changes_skip_uncommitted_transactions():
+    sql = compile(changes_service.select_changes("5-3", None))
+
+    # Изменения транзакций, которые еще могут зафиксироваться с меньшим
+    # txid, не отдаются: курсор не перепрыгнет через них
+    assert "txid_snapshot_xmin(txid_current_snapshot())" in sql
+    assert "(change_log.txid, change_log.id) >" in sql
+    assert sql.endswith("ORDER BY change_log.txid, change_log.id")
+
+
+def test_check_budget(monkeypatch):
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_STRICT", True)
+    stats = QueryStats(debug=True)
+    stats.budget = 1
+
+    stats.check_budget()
+    stats.queries = 1
+    with pytest.raises(QueryBudgetExceeded) as error:
+        stats.check_budget()
+    assert (error.value.budget, error.value.queries) == (1, 2)
+
+    stats.debug = False
+    stats.check_budget()
+
+
+def test_check_schemas():
+    class Extra(BaseModel):
+        name: str
+        unknown: int
+
+    check_schemas(models.project, schemas.Project, [schemas.ProjectCreate])
+    with pytest.raises(TypeError, match="unknown"):
+        check_schemas(models.project, schemas.Project, [Extra])
+    with pytest.raises(TypeError, match="нет полей"):
+        check_schemas(models.project, Extra, [])